@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# batch_gcd.py
+# GCD par lots (Bernstein) : trouve tous les modules RSA qui partagent un
+# facteur avec un autre, en temps quasi linéaire au lieu de n^2 gcd.
+#   1) arbre des produits : feuilles = modules, chaque noeud = produit de ses fils
+#   2) arbre des restes : en descendant, R_noeud = R_parent mod noeud^2
+#   3) feuille n_i : g_i = gcd(R_i / n_i, n_i)  (R_i = P mod n_i^2)
+# g_i > 1 : n_i partage un premier avec un autre module. g_i = n_i arrive quand
+# les deux premiers sont partagés (cas du challenge) : ces modules-là sont
+# séparés par gcd deux à deux, entre eux seulement.
+# Chaque niveau des arbres est calculé en parallèle (multiprocessing) ; les
+# factorisations sortent au fil de l'eau, bloc de feuilles par bloc de feuilles.
+#
+#   python3 batch_gcd.py moduli.txt --workers 8           # un module par ligne (décimal ou 0x...)
+#   python3 batch_gcd.py --demo 2000 --bits 1024 --shared 20
+
+import argparse, os, random, sys, time
+from math import gcd
+from multiprocessing import Pool
+
+try:
+    from gmpy2 import mpz, gcd as big_gcd     # multiplication/modulo bien plus rapides si disponible
+except ImportError:
+    mpz, big_gcd = int, gcd
+
+LEAF_CHUNK = 256       # feuilles par bloc dans la dernière étape (granularité du flux)
+NATIVE_BITS = 1 << 17  # au-delà, sans gmpy2, réduction de Barrett plutôt que % (quadratique)
+
+def recip(m):
+    """floor(4^b / m), b = bitlen(m) : Newton en précision doublée, multiplications seulement."""
+    b = m.bit_length()
+    if b <= NATIVE_BITS:
+        return (1 << (2 * b)) // m
+    h = b // 2 + 32
+    r = recip(m >> (b - h)) << (b - h)          # h bits justes
+    r = (r << 1) - ((m * r * r) >> (2 * b))     # r (2 - m r / 4^b) : ~2h bits justes
+    one, t = 1 << (2 * b), m * r
+    while t > one:
+        r, t = r - 1, t - m
+    while t + m <= one:
+        r, t = r + 1, t + m
+    return r
+
+def mod(x, m):
+    """x mod m (x >= 0)."""
+    b = m.bit_length()
+    if mpz is not int or b <= NATIVE_BITS:
+        return x % m
+    r = recip(m)
+    # noeuds déséquilibrés : x peut dépasser 4^b, on replie les bits de tête par tranches
+    while x.bit_length() > 2 * b:
+        s = x.bit_length() - 2 * b
+        x = (_barrett(x >> s, m, r, b) << s) | (x & ((1 << s) - 1))
+    return _barrett(x, m, r, b)
+
+def _barrett(x, m, r, b):
+    x -= ((x * r) >> (2 * b)) * m
+    while x >= m:
+        x -= m
+    return x
+
+def _mul(pair):
+    a, b = pair
+    return a * b
+
+def _mod_sq(pair):
+    r, n = pair
+    return mod(r, n * n)
+
+def _leaf(task):
+    rs, ns, base = task
+    out = []
+    for k, (r, n) in enumerate(zip(rs, ns)):
+        g = big_gcd(r % (n * n) // n, n)
+        if g > 1:
+            out.append((base + k, int(g)))
+    return out
+
+def _map(pool, fn, tasks, workers):
+    # les niveaux hauts n'ont qu'une poignée d'énormes noeuds : pas de parallélisme utile
+    if pool is None or len(tasks) < 2 * workers:
+        return [fn(t) for t in tasks]
+    return pool.map(fn, tasks, chunksize=max(1, len(tasks) // (4 * workers)))
+
+def product_tree(moduli, pool=None, workers=1):
+    levels = [[mpz(n) for n in moduli]]
+    while len(levels[-1]) > 1:
+        cur = levels[-1]
+        pairs = [(cur[i], cur[i + 1]) for i in range(0, len(cur) - 1, 2)]
+        nxt = _map(pool, _mul, pairs, workers)
+        if len(cur) % 2:
+            nxt.append(cur[-1])
+        levels.append(nxt)
+    return levels
+
+def shared_factors(moduli, workers=1):
+    """
+    Génère (i, g) pour chaque module i avec g = gcd(n_i, produit des autres) > 1,
+    au fur et à mesure des blocs de feuilles.
+    """
+    if len(moduli) < 2:
+        return
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        levels = product_tree(moduli, pool, workers)
+        rems = levels[-1]
+        for lvl in reversed(levels[1:-1]):
+            rems = _map(pool, _mod_sq, [(rems[i // 2], n) for i, n in enumerate(lvl)], workers)
+        leaves = levels[0]
+        parents = [rems[i // 2] for i in range(len(leaves))] if len(levels) > 1 else rems
+        tasks = [(parents[a:a + LEAF_CHUNK], leaves[a:a + LEAF_CHUNK], a)
+                 for a in range(0, len(leaves), LEAF_CHUNK)]
+        results = pool.imap(_leaf, tasks) if pool else map(_leaf, tasks)
+        for found in results:
+            yield from found
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+def factorizations(moduli, workers=1):
+    """
+    Génère (i, p, q) avec n_i = p * q pour chaque module factorisable.
+    Les g_i = n_i (deux premiers partagés) sont traités à la fin, par gcd deux à
+    deux entre modules signalés ; (i, n_i, None) signale un module dupliqué.
+    """
+    moduli = [int(n) for n in moduli]
+    deferred, flagged = [], []
+    for i, g in shared_factors(moduli, workers):
+        flagged.append(i)
+        if g < moduli[i]:
+            yield i, g, moduli[i] // g
+        else:
+            deferred.append(i)
+    for i in deferred:
+        n = moduli[i]
+        for j in flagged:
+            h = gcd(n, moduli[j]) if j != i else 1
+            if 1 < h < n:
+                yield i, h, n // h
+                break
+        else:
+            yield i, n, None
+
+# -------------------- démo / benchmark --------------------
+
+def _primorial(limit):
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b"\0\0"
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytearray(len(sieve[i * i::i]))
+    prod = 1
+    for i in range(limit):
+        if sieve[i]:
+            prod *= i
+    return prod
+
+SMALL = _primorial(20000)      # un gcd élimine la plupart des candidats composés
+
+def is_probable_prime(n, rounds=8):
+    if n < 20000:
+        return n > 1 and all(n % p for p in range(2, int(n ** 0.5) + 1))
+    if gcd(n, SMALL) != 1:
+        return False
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+    for _ in range(rounds):
+        x = pow(mpz(random.randrange(2, int(n) - 1)), d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def random_prime(bits, rng=random):
+    while True:
+        p = mpz(rng.getrandbits(bits) | (1 << (bits - 1)) | 1)
+        if is_probable_prime(p):
+            return int(p)
+
+def _demo_prime(task):
+    bits, seed = task
+    return random_prime(bits, random.Random(seed))
+
+def demo_moduli(count, bits, shared, rng, workers=1):
+    """count modules de bits bits ; shared d'entre eux réutilisent un premier d'un autre."""
+    tasks = [(bits // 2, rng.getrandbits(64)) for _ in range(2 * count)]
+    if workers > 1:
+        with Pool(workers) as pool:
+            primes = pool.map(_demo_prime, tasks, chunksize=16)
+    else:
+        primes = [_demo_prime(t) for t in tasks]
+    moduli = [primes[2 * i] * primes[2 * i + 1] for i in range(count)]
+    victims = rng.sample(range(count), 2 * min(shared, count // 2))     # paires complètes seulement
+    for a, b in zip(victims[::2], victims[1::2]):
+        moduli[b] = primes[2 * a] * primes[2 * b + 1]       # n_a et n_b partagent p_a
+    return moduli, sorted(victims)
+
+def read_moduli(path):
+    with open(path) as f:
+        return [int(ln.strip(), 0) for ln in f if ln.strip() and not ln.startswith("#")]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("moduli", nargs="?", help="fichier : un module par ligne")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--out", default=None, help="écrire 'i p q' par ligne (défaut : stdout)")
+    ap.add_argument("--demo", type=int, default=0, help="générer N modules de test")
+    ap.add_argument("--bits", type=int, default=1024)
+    ap.add_argument("--shared", type=int, default=10, help="démo : paires qui partagent un premier")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    if args.demo:
+        t0 = time.perf_counter()
+        moduli, expect = demo_moduli(args.demo, args.bits, args.shared, random.Random(args.seed), args.workers)
+        print(f"[*] {len(moduli)} modules de {args.bits} bits générés en {time.perf_counter() - t0:.1f}s",
+              file=sys.stderr)
+    elif args.moduli:
+        moduli, expect = read_moduli(args.moduli), None
+    else:
+        ap.error("fichier de modules ou --demo requis")
+
+    out = open(args.out, "w") if args.out else sys.stdout
+    t0 = time.perf_counter()
+    found = []
+    for i, p, q in factorizations(moduli, args.workers):
+        found.append(i)
+        out.write(f"{i} {p} {q if q is not None else 'duplicate'}\n")
+        out.flush()
+    dt = time.perf_counter() - t0
+    if args.out:
+        out.close()
+    print(f"[*] {len(found)}/{len(moduli)} modules factorisés en {dt:.2f}s "
+          f"({args.workers} processus, gmpy2 {'oui' if mpz is not int else 'non'})", file=sys.stderr)
+    if expect is not None:
+        print(f"[*] attendu {len(expect)}, {'OK' if sorted(found) == expect else 'DIFFÉRENT'}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# layered.py
+# Déchiffrement RSA multi-couches (c = E_kK(...E_k1(m))) quand l'ordre des
+# couches est inconnu.
+# - chaque clef déchiffre par CRT : dP = d mod (p-1), dQ = d mod (q-1),
+#   qInv = q^-1 mod p, deux exponentiations sur des modules de moitié taille
+# - les ordres sont parcourus comme un arbre de préfixes (DFS) : le noeud
+#   "préfixe" garde la valeur déjà pelée, chaque pas (préfixe, clef) n'est
+#   calculé qu'une fois. K clefs : ~e.K! pas au lieu de K.K! exponentiations
+# - élagage : la valeur pelée doit être < n de la clef suivante (un vrai
+#   chiffré intermédiaire est toujours réduit modulo son n)
+# - en option, les sous-arbres du premier niveau partent sur des processus
+#
+#   python3 layered.py --demo 6 --bits 1024
+#   (solve.py l'utilise pour les 3 clefs du challenge)
+
+import argparse, random, sys, time
+from multiprocessing import Pool
+
+try:
+    from gmpy2 import mpz, powmod
+except ImportError:
+    mpz, powmod = int, pow
+
+class CRTKey:
+    def __init__(self, n, e, p, q, name=None):
+        assert p * q == n
+        self.n, self.e, self.p, self.q = mpz(n), e, mpz(p), mpz(q)
+        d = pow(e, -1, (p - 1) * (q - 1))
+        self.dP, self.dQ = mpz(d % (p - 1)), mpz(d % (q - 1))
+        self.qInv = mpz(pow(q, -1, p))
+        self.name = name
+
+    def decrypt(self, c):
+        m1 = powmod(c % self.p, self.dP, self.p)
+        m2 = powmod(c % self.q, self.dQ, self.q)
+        h = self.qInv * (m1 - m2) % self.p
+        return m2 + h * self.q
+
+    def encrypt(self, m):
+        return powmod(mpz(m), self.e, self.n)
+
+    def __repr__(self):
+        return self.name or f"n{int(self.n) % 10**6:06d}"
+
+def i2b(x) -> bytes:
+    x = int(x)
+    return x.to_bytes((x.bit_length() + 7) // 8, "big")
+
+def looks_like_flag(x) -> bool:
+    pt = i2b(x)
+    return b"ctf{" in pt or b"CTF{" in pt
+
+class Search:
+    """DFS sur l'arbre des ordres de déchiffrement ; stats : pas CRT, branches élaguées."""
+    def __init__(self, keys, check=looks_like_flag, first=True):
+        self.keys, self.check, self.first = keys, check, first
+        self.steps = self.pruned = 0
+        self.found = []
+
+    def run(self, c, used=()):
+        """used : clefs déjà pelées (indices, dans l'ordre de déchiffrement)."""
+        self._dfs(mpz(c), list(used), [i for i in range(len(self.keys)) if i not in used])
+        return self.found
+
+    def _dfs(self, x, path, rest):
+        if not rest:
+            if self.check(x):
+                # ordre d'encryptage = inverse de l'ordre de déchiffrement
+                self.found.append((tuple(reversed(path)), int(x)))
+            return
+        for k in rest:
+            key = self.keys[k]
+            if x >= key.n:
+                self.pruned += 1
+                continue
+            self.steps += 1
+            y = key.decrypt(x)
+            self._dfs(y, path + [k], [j for j in rest if j != k])
+            if self.first and self.found:
+                return
+
+def _subtree(task):
+    keys, c, k, first = task
+    s = Search(keys, first=first)
+    if c >= keys[k].n:
+        return [], 0, 1
+    s.steps = 1
+    found = s.run(keys[k].decrypt(mpz(c)), used=(k,))
+    return found, s.steps, s.pruned
+
+def search(keys, c, workers=1, first=True):
+    """[(ordre d'encryptage (indices), clair)], pas CRT, branches élaguées."""
+    if workers <= 1 or len(keys) < 2:
+        s = Search(keys, first=first)
+        return s.run(c), s.steps, s.pruned
+    found, steps, pruned = [], 0, 0
+    with Pool(min(workers, len(keys))) as pool:
+        for f, st, pr in pool.imap_unordered(_subtree, [(keys, c, k, first) for k in range(len(keys))]):
+            found += f
+            steps += st
+            pruned += pr
+            if first and found:
+                pool.terminate()
+                break
+    return found, steps, pruned
+
+def naive_cost(K):
+    """Exponentiations pleine taille du parcours naïf : K couches pour chacun des K! ordres."""
+    f = 1
+    for i in range(2, K + 1):
+        f *= i
+    return K * f
+
+# -------------------- démo --------------------
+
+def demo(K, bits, rng, flag=b"CTF{layered_rsa_demo}"):
+    from batch_gcd import random_prime
+    keys = []
+    for i in range(K):
+        p, q = random_prime(bits // 2, rng), random_prime(bits // 2, rng)
+        keys.append(CRTKey(p * q, 65537, p, q, name=f"k{i}"))
+    order = list(range(K))
+    rng.shuffle(order)
+    while True:
+        # un ordre n'est déchiffrable que si chaque chiffré intermédiaire reste < n suivant
+        m = int.from_bytes(flag + rng.getrandbits(64).to_bytes(8, "big"), "big")
+        x, ok = mpz(m), True
+        for k in order:
+            if x >= keys[k].n:
+                ok = False
+                break
+            x = keys[k].encrypt(x)
+        if ok:
+            return keys, int(x), order, m
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--demo", type=int, default=5, help="nombre de couches")
+    ap.add_argument("--bits", type=int, default=1024)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--all", action="store_true", help="ne pas s'arrêter au premier ordre trouvé")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    keys, c, order, m = demo(args.demo, args.bits, random.Random(args.seed))
+    t0 = time.perf_counter()
+    found, steps, pruned = search(keys, c, args.workers, not args.all)
+    dt = time.perf_counter() - t0
+    for enc_order, x in found:
+        print("[+] ordre :", " -> ".join(repr(keys[k]) for k in enc_order), "|", i2b(x)[:24])
+    print(f"[*] {args.demo} couches : {steps} pas CRT ({pruned} branches élaguées) en {dt:.2f}s ; "
+          f"naïf : {naive_cost(args.demo)} exponentiations pleine taille", file=sys.stderr)
+    if not any(list(o) == order and x == m for o, x in found):
+        print("[-] ordre attendu non retrouvé", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
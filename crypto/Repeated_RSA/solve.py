@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # Repeated RSA – solve script
-from math import gcd
-from itertools import permutations
+from batch_gcd import factorizations
+from layered import CRTKey, search
 
 # ---- données du challenge ----
 c = int("9281773316120350315826907806520559817444561211011988641015426039152919084313218839788802529759220156095222918014358588164712744457411489810471078979440693678635385889978824998147332489867324980077335149522660658521632946341248435046700549521064854814673927080235501844478078087125767372666366815199837763622919751713551452390128441218320917092494084056137627971480558273760918327050821616864342634116437633410520821134031440942633128130715646803414949025642899694129734517860274023352351147963702729509066577244118849930240762575192232563647273846782261554851439475411926563766997474754827102480557961332006144467949")
@@ -18,63 +18,35 @@ e = 65537
 def i2b(x: int) -> bytes:
     return x.to_bytes((x.bit_length() + 7) // 8, "big")
 
-def modinv(a: int, m: int) -> int:
-    # Python 3.8+: pow supports modular inverse; fallback just in case
-    try:
-        return pow(a, -1, m)
-    except TypeError:
-        # Extended Euclid
-        def egcd(a, b):
-            if b == 0:
-                return (a, 1, 0)
-            g, y, x = egcd(b, a % b)
-            return (g, x, y - (a // b) * x)
-        g, x, _ = egcd(a, m)
-        if g != 1:
-            raise ValueError("inverse does not exist")
-        return x % m
-
-# ---- factorisations via GCD (les modules partagent des facteurs) ----
-p12 = gcd(n1, n2)  # = pA
-p13 = gcd(n1, n3)  # = pB
-p23 = gcd(n2, n3)  # = pC
+# ---- factorisations via GCD par lots (les modules partagent des facteurs) ----
+factors = {i: (p, q) for i, p, q in factorizations([n1, n2, n3])}
+p12 = [p for p in factors[0] if n2 % p == 0][0]  # = pA
+p13 = n1 // p12                                   # = pB
+p23 = n2 // p12                                   # = pC
 
 assert n1 == p12 * p13
 assert n2 == p12 * p23
 assert n3 == p13 * p23
 
-phi1 = (p12 - 1) * (p13 - 1)
-phi2 = (p12 - 1) * (p23 - 1)
-phi3 = (p13 - 1) * (p23 - 1)
-
-d1 = modinv(e, phi1)
-d2 = modinv(e, phi2)
-d3 = modinv(e, phi3)
-
-keys = {
-    'n1': (n1, d1),
-    'n2': (n2, d2),
-    'n3': (n3, d3),
-}
+# clefs CRT (dP, dQ, qInv) : deux exponentiations sur des modules de moitié taille
+keys = [
+    CRTKey(n1, e, p12, p13, 'n1'),
+    CRTKey(n2, e, p12, p23, 'n2'),
+    CRTKey(n3, e, p13, p23, 'n3'),
+]
 
-# On ne connaît pas l’ordre d’encryptage, donc on teste les 6 permutations
+# On ne connaît pas l’ordre d’encryptage : arbre des préfixes de déchiffrement
+# (layered.search), chaque pas (préfixe, clef) calculé une seule fois
+found, steps, pruned = search(keys, c)
 flag = None
-for enc_order in permutations(['n1', 'n2', 'n3'], 3):
-    # déchiffrer dans l’ordre inverse
-    x = c
-    for name in reversed(enc_order):
-        n, d = keys[name]
-        x = pow(x, d, n)
-    pt = i2b(x)
-    if b'ctf{' in pt or b'CTF{' in pt:
-        flag = pt.decode(errors='ignore')
-        print("[+] Encryption order was:", " -> ".join(enc_order))
-        print("[+] Flag:", flag)
-        break
+for enc_order, x in found:
+    flag = i2b(x).decode(errors='ignore')
+    print("[+] Encryption order was:", " -> ".join(repr(keys[k]) for k in enc_order))
+    print("[+] Flag:", flag)
+print(f"[*] {steps} déchiffrements CRT, {pruned} branches élaguées")
 
 if not flag:
     # Rien trouvé ? Afficher les 3 décodages simples (au cas où).
     print("[-] Aucun flag trouvé automatiquement. Candidats (simple RSA) :")
-    for name, (n, d) in keys.items():
-        m = pow(c, d, n)
-        print(name, i2b(m))
+    for key in keys:
+        print(key, i2b(key.decrypt(c)) if c < key.n else "(c >= n)")
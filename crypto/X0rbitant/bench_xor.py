@@ -0,0 +1,86 @@
+# bench_xor.py
+# Débit du XOR à clé répétée : ancienne boucle octet par octet (mesurée sur un
+# échantillon puis extrapolée) contre xorstream en flux (read/write) et en mmap.
+# Vérifie aussi que le déchiffrement du chiffré redonne l'entrée.
+#
+#   python3 bench_xor.py --size-mb 1024
+
+import argparse, json, os, resource, tempfile, time
+import numpy as np
+from xorstream import xor_file
+
+KEY = b"CTF{940a422746b832e652a991d88d31eb4d0ab2774a1f9a637e746b9226dfd44bca}"
+
+def old_xor(data: bytes, key: bytes) -> bytes:
+    # enc.py d'origine, blocs de 4096
+    out, i = [], 0
+    for s in range(0, len(data), 4096):
+        chunk = data[s:s + 4096]
+        out.append(bytes([b ^ key[(i + j) % len(key)] for j, b in enumerate(chunk)]))
+        i += len(chunk)
+    return b"".join(out)
+
+def make_input(path, size):
+    """Texte pseudo-aléatoire imprimable, écrit par blocs (mémoire constante)."""
+    rng = np.random.default_rng(0)
+    with open(path, "wb") as f:
+        left = size
+        while left:
+            n = min(left, 1 << 24)
+            f.write(rng.integers(32, 127, n, dtype=np.uint8).tobytes())
+            left -= n
+
+def same_files(a, b, chunk=1 << 24):
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        while True:
+            x, y = fa.read(chunk), fb.read(chunk)
+            if x != y:
+                return False
+            if not x:
+                return True
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size-mb", type=int, default=1024)
+    ap.add_argument("--sample-mb", type=float, default=4, help="taille mesurée pour l'ancienne boucle")
+    ap.add_argument("--dir", default=None, help="répertoire de travail (défaut : tmp)")
+    ap.add_argument("--out", default=None, help="résultats JSON")
+    args = ap.parse_args()
+    size = args.size_mb << 20
+
+    res = {"size_bytes": size}
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        src, enc, dec = (os.path.join(tmp, n) for n in ("in.bin", "enc.bin", "dec.bin"))
+        make_input(src, size)
+
+        sample = open(src, "rb").read(int(args.sample_mb * (1 << 20)))
+        t0 = time.perf_counter()
+        old_xor(sample, KEY)
+        dt = time.perf_counter() - t0
+        res["old_mb_s"] = len(sample) / dt / 2**20
+        print(f"ancienne boucle : {res['old_mb_s']:8.1f} MiB/s (sur {len(sample) >> 20} MiB, "
+              f"~{size / (len(sample) / dt):.0f}s extrapolé pour {args.size_mb} MiB)")
+
+        for mode, use_mmap in (("stream", False), ("mmap", True)):
+            t0 = time.perf_counter()
+            xor_file(src, enc, KEY, use_mmap)
+            dt = time.perf_counter() - t0
+            xor_file(enc, dec, KEY, use_mmap)
+            ok = same_files(src, dec)
+            res[f"{mode}_mb_s"] = size / dt / 2**20
+            res[f"{mode}_roundtrip_ok"] = ok
+            # cumulatif : après "mmap" il inclut les pages de fichier mappées
+            res[f"peak_rss_after_{mode}_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"xorstream {mode:6s}: {res[f'{mode}_mb_s']:8.1f} MiB/s ({dt:.2f}s), aller-retour "
+                  f"{'OK' if ok else 'FAUX'}")
+            os.remove(enc)
+            os.remove(dec)
+
+    print(f"pic RSS : {res['peak_rss_after_stream_mb']:.0f} MiB après le flux, "
+          f"{res['peak_rss_after_mmap_mb']:.0f} MiB après mmap (pages de fichier comprises)")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(res, f, indent=1)
+
+if __name__ == "__main__":
+    main()
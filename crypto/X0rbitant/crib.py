@@ -0,0 +1,127 @@
+# crib.py
+# Crib dragging pour un XOR à clé répétée de longueur connue.
+# Chaque crib w (mot probable : "the ", " and ", en-têtes...) est glissé sur
+# tous les décalages i d'un coup : la vue sliding_window_view(c, len(w)) XOR w
+# donne, pour chaque placement, les octets de clef impliqués pour les colonnes
+# (i + j) % key_len. Un placement est gardé si
+#   1) tous ses octets impliqués sont permis dans leur colonne (alphabet de la
+#      clef : hex à l'intérieur de CTF{...}, octets fixes du préfixe/suffixe)
+#   2) il est d'accord avec le consensus (vote majoritaire par colonne) sur
+#      toutes les colonnes qu'il couvre.
+# Les vrais placements votent tous pour le même octet ; le bruit se disperse.
+# Quelques kilo-octets de chiffré suffisent à fixer la plupart des colonnes.
+#
+#   python3 crib.py out.bin --key-len 69 --bytes 4000 --crib "the " " and " " of "
+
+import argparse
+import numpy as np
+
+CHUNK = 1 << 20        # placements traités par passe
+CRIBS = ("the ", " and ", " of ", " to ", "tion", "ing ")
+HEX = b"0123456789abcdef"
+
+def allowed_table(key_len: int, prefix: bytes = b"CTF{", suffix: bytes = b"}",
+                  inner: bytes = HEX) -> np.ndarray:
+    """(key_len, 256) bool : octets de clef possibles par colonne (format du flag)."""
+    allowed = np.zeros((key_len, 256), dtype=bool)
+    if key_len < len(prefix) + len(suffix):
+        allowed[:] = True
+        return allowed
+    allowed[:, np.frombuffer(inner, dtype=np.uint8)] = True
+    for i, v in enumerate(prefix):
+        allowed[i] = False
+        allowed[i, v] = True
+    for i, v in enumerate(suffix, key_len - len(suffix)):
+        allowed[i] = False
+        allowed[i, v] = True
+    return allowed
+
+def placements(cipher, crib: bytes, key_len: int, allowed=None):
+    """
+    Placements plausibles d'un crib : (offsets, implied) avec implied[p, j] =
+    octet de clef pour la colonne (offsets[p] + j) % key_len.
+    """
+    data = np.frombuffer(cipher, dtype=np.uint8) if isinstance(cipher, (bytes, bytearray)) else cipher
+    w = np.frombuffer(crib, dtype=np.uint8)
+    m = len(w)
+    if len(data) < m:
+        return np.zeros(0, dtype=np.intp), np.zeros((0, m), dtype=np.uint8)
+    win = np.lib.stride_tricks.sliding_window_view(data, m)
+    offs, imps = [], []
+    for a in range(0, len(win), CHUNK):
+        implied = win[a:a + CHUNK] ^ w                       # (p, m)
+        off = np.arange(a, a + len(implied))
+        if allowed is not None:
+            cols = (off[:, None] + np.arange(m)) % key_len
+            ok = allowed[cols, implied].all(axis=1)
+            off, implied = off[ok], implied[ok]
+        offs.append(off)
+        imps.append(implied)
+    return np.concatenate(offs), np.concatenate(imps)
+
+def votes_for(key_len: int, found):
+    """(key_len, 256) nombre de placements votant pour chaque octet de clef."""
+    votes = np.zeros(key_len * 256, dtype=np.int64)
+    for off, implied in found:
+        cols = (off[:, None] + np.arange(implied.shape[1])) % key_len
+        votes += np.bincount((cols * 256 + implied).ravel(), minlength=key_len * 256)
+    return votes.reshape(key_len, 256)
+
+def consensus(votes, min_votes: int = 2, margin: float = 2.0):
+    """Octet retenu par colonne (-1 si aucun n'a min_votes et margin fois le second)."""
+    srt = np.sort(votes, axis=1)
+    best, second = srt[:, -1], srt[:, -2]
+    pick = votes.argmax(axis=1)
+    sure = (best >= min_votes) & (best >= margin * second)
+    return np.where(sure, pick, -1)
+
+def drag(cipher, cribs, key_len: int, allowed=None, min_votes: int = 3, rounds: int = 3):
+    """
+    Fait glisser tous les cribs ; garde les placements d'accord avec le
+    consensus et recommence jusqu'à stabilité.
+    Renvoie (key, votes, kept) : key[c] = octet ou -1, kept = {crib: offsets}.
+    """
+    found = {c: placements(cipher, c.encode() if isinstance(c, str) else c, key_len, allowed)
+             for c in cribs}
+    cur = dict(found)
+    key = np.full(key_len, -1)
+    for _ in range(rounds):
+        votes = votes_for(key_len, cur.values())
+        key = consensus(votes, min_votes)
+        nxt = {}
+        for c, (off, implied) in found.items():
+            cols = (off[:, None] + np.arange(implied.shape[1])) % key_len
+            k = key[cols]
+            # d'accord partout où le consensus existe, et au moins une colonne confirmée
+            agree = ((k == -1) | (k == implied)).all(axis=1) & (k != -1).any(axis=1)
+            nxt[c] = (off[agree], implied[agree])
+        if all(len(nxt[c][0]) == len(cur[c][0]) for c in cur):
+            break
+        cur = nxt
+    votes = votes_for(key_len, cur.values())
+    key = consensus(votes, min_votes)
+    return key, votes, {c: off for c, (off, _) in cur.items()}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("path", nargs="?", default="out.bin")
+    ap.add_argument("--key-len", type=int, default=69)
+    ap.add_argument("--bytes", type=int, default=None, help="n'utiliser que le début du chiffré")
+    ap.add_argument("--crib", nargs="+", default=list(CRIBS))
+    ap.add_argument("--any-key", action="store_true", help="pas de contrainte de format sur la clef")
+    ap.add_argument("--min-votes", type=int, default=3)
+    args = ap.parse_args()
+
+    cipher = np.memmap(args.path, dtype=np.uint8, mode="r")
+    if args.bytes:
+        cipher = cipher[:args.bytes]
+    allowed = None if args.any_key else allowed_table(args.key_len)
+    key, votes, kept = drag(cipher, args.crib, args.key_len, allowed, args.min_votes)
+    for c, off in kept.items():
+        print(f"{c!r}: {len(off)} placements gardés")
+    shown = "".join(chr(k) if 32 <= k < 127 else "?" for k in np.where(key >= 0, key, ord("?")))
+    print(f"{int((key >= 0).sum())}/{args.key_len} colonnes fixées sur {len(cipher)} octets")
+    print(shown)
+
+if __name__ == "__main__":
+    main()
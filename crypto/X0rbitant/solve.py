@@ -1,64 +1,179 @@
 # solve_xor_flag.py
 # Récupère la clef (flag) d'un XOR à clé répétée, sachant que:
-# - key_len = 69
-# - key[0:4] = "CTF{", key[68] = "}"
-# - key[4:68] sont des hex [0-9a-f]
+# - key_len = 69 (ou détectée : voir rank_key_lengths)
+# - key commence par "CTF{" et finit par "}"
+# - l'intérieur est en hex [0-9a-f]
 # - Le plaintext est essentiellement ASCII lisible.
+#
+# Détection de la longueur : c[i] == c[i+s] arrive souvent quand s est un
+# multiple de la longueur de clef (même octet de clef des deux côtés, donc
+# coïncidence du texte clair) et rarement sinon. On mesure ce taux pour chaque
+# décalage s <= max_len, puis chaque longueur L reçoit la moyenne sur ses
+# multiples (vue strided rate[L::L]).
+#
+#   python3 solve.py                      # longueur détectée automatiquement
+#   python3 solve.py out.bin --key-len 69
 
+import argparse
 from pathlib import Path
+import numpy as np
+from xorstream import xor_array, xor_bytes, xor_file
+from crib import CRIBS, allowed_table, drag
 
 CIPH_PATH = "out.bin"
 KEY_LEN = 69
+FLAG_PREFIX = b"CTF{"
+FLAG_SUFFIX = b"}"
+CHUNK = 1 << 22        # octets lus par passe pour les histogrammes
+SAMPLE = 1 << 18       # octets comparés par décalage pour la détection
+MAX_LEN = 4096
+MIN_ROWS = 8           # longueur détectable max = taille / MIN_ROWS
 
 def is_printable_byte(b: int) -> bool:
     # ASCII imprimable + tab/CR/LF
     return (32 <= b <= 126) or b in (9, 10, 13)
 
-def recover_key(cipher: bytes) -> bytes:
-    key = [None] * KEY_LEN
-    # Contraintes connues
-    known = {0: ord('C'), 1: ord('T'), 2: ord('F'), 3: ord('{'), 68: ord('}')}
-    for i, v in known.items():
-        key[i] = v
+def byte_metric(pb: int) -> float:
+    # imprimable (+ léger bonus espaces/lettres)
+    return (is_printable_byte(pb) + (pb == 32) * 0.1
+            + (65 <= pb <= 90 or 97 <= pb <= 122) * 0.01)
 
-    # Indices par position modulo KEY_LEN
-    buckets = {r: [] for r in range(KEY_LEN)}
-    for i, c in enumerate(cipher):
-        buckets[i % KEY_LEN].append(c)
+# SCORE[k, c] = score de l'octet clair c ^ k : avec l'histogramme h d'une
+# colonne, le score de chaque candidat k est (SCORE @ h)[k], O(256) par candidat
+_METRIC = np.array([byte_metric(p) for p in range(256)])
+SCORE = _METRIC[np.arange(256)[:, None] ^ np.arange(256)[None, :]]
+
+def load_cipher(path=CIPH_PATH) -> np.ndarray:
+    """out.bin en lecture seule via mmap (rien n'est copié en mémoire)."""
+    if Path(path).stat().st_size == 0:
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+def column_histograms(cipher, key_len: int = KEY_LEN) -> np.ndarray:
+    """
+    (key_len, 256) : nombre d'occurrences de chaque octet par position
+    modulo key_len, en une seule passe sur les données.
+    """
+    data = np.frombuffer(cipher, dtype=np.uint8) if isinstance(cipher, (bytes, bytearray)) else cipher
+    n = len(data)
+    full = n - n % key_len
+    rows = data[:full].reshape(-1, key_len)       # vue (lignes, key_len), pas de copie
+    base = (np.arange(key_len, dtype=np.intp) * 256)
+    counts = np.zeros(key_len * 256, dtype=np.int64)
+    step = max(1, CHUNK // key_len)
+    for s in range(0, len(rows), step):
+        idx = rows[s:s + step] + base              # colonne * 256 + octet
+        counts += np.bincount(idx.ravel(), minlength=key_len * 256)
+    tail = np.asarray(data[full:])
+    counts += np.bincount(base[:len(tail)] + tail, minlength=key_len * 256)
+    return counts.reshape(key_len, 256)
+
+def coincidence_rates(cipher, max_len: int = MAX_LEN, sample: int = SAMPLE) -> np.ndarray:
+    """rate[s] = proportion de i < sample avec c[i] == c[i+s], pour 1 <= s <= max_len."""
+    data = np.asarray(cipher[:sample + max_len])
+    rate = np.zeros(max_len + 1)
+    for s in range(1, min(max_len, len(data) - 1) + 1):
+        m = min(sample, len(data) - s)
+        rate[s] = np.count_nonzero(data[:m] == data[s:s + m]) / m
+    return rate
+
+def rank_key_lengths(cipher, max_len: int = MAX_LEN, top: int = 5, sample: int = SAMPLE):
+    """Les `top` longueurs les plus probables, [(L, score)], meilleure d'abord."""
+    # au moins MIN_ROWS lignes par colonne, sinon les grandes longueurs sont du bruit
+    max_len = max(1, min(max_len, len(cipher) // MIN_ROWS))
+    rate = coincidence_rates(cipher, max_len, sample)
+    max_len = min(max_len, len(rate) - 1)
+    score = np.zeros(max_len + 1)
+    for L in range(1, max_len + 1):
+        score[L] = rate[L::L].mean()
+    ranked = []
+    for L in np.argsort(-score[1:], kind="stable") + 1:
+        L = int(L)
+        # 2L, 3L... ont le même score que L : on garde le plus petit diviseur aussi bon
+        while True:
+            d = min(d for d in range(1, L + 1) if L % d == 0 and score[d] >= 0.9 * score[L])
+            if d == L:
+                break
+            L = d
+        if L not in (l for l, _ in ranked):
+            ranked.append((L, float(score[L])))
+        if len(ranked) == top:
+            break
+    return ranked
+
+def recover_key_scored(cipher, key_len: int = KEY_LEN, cribs=None):
+    """(clef, score moyen par octet déchiffré) pour une longueur donnée."""
+    key = [None] * key_len
+    # Contraintes connues (si la clef est assez longue pour les contenir)
+    if key_len >= len(FLAG_PREFIX) + len(FLAG_SUFFIX):
+        for i, v in enumerate(FLAG_PREFIX):
+            key[i] = v
+        for i, v in enumerate(FLAG_SUFFIX, key_len - len(FLAG_SUFFIX)):
+            key[i] = v
+    # Colonnes fixées par crib dragging (crib.py), prioritaires sur les scores
+    if cribs:
+        pinned, _, _ = drag(cipher, cribs, key_len, allowed_table(key_len, FLAG_PREFIX, FLAG_SUFFIX))
+        for r in np.flatnonzero(pinned >= 0):
+            if key[r] is None:
+                key[r] = int(pinned[r])
 
     # Alphabet restreint pour l'intérieur de CTF{...}
-    hexset = b"0123456789abcdef"
-
-    for r in range(KEY_LEN):
-        if key[r] is not None:
-            continue
-        best_char, best_score = None, -1.0
-        for ch in hexset:
-            # Score = nombre d'octets déchiffrés imprimables (+ léger bonus espaces/lettres)
-            plain_bytes = [c ^ ch for c in buckets[r]]
-            score = sum(1 for pb in plain_bytes if is_printable_byte(pb))
-            spaces = sum(1 for pb in plain_bytes if pb == 32)
-            letters = sum(1 for pb in plain_bytes if (65 <= pb <= 90 or 97 <= pb <= 122))
-            metric = score + spaces * 0.1 + letters * 0.01
-            if metric > best_score:
-                best_score, best_char = metric, ch
-        key[r] = best_char
-
-    return bytes(key)
-
-def decrypt(cipher: bytes, key: bytes) -> bytes:
-    kl = len(key)
-    return bytes([b ^ key[i % kl] for i, b in enumerate(cipher)])
+    hexset = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+    # Score = nombre d'octets déchiffrés imprimables (+ léger bonus espaces/lettres),
+    # pour tous les candidats et toutes les colonnes d'un coup
+    hists = column_histograms(cipher, key_len)
+    scores = hists @ SCORE[hexset].T     # (key_len, 16)
+    best = hexset[scores.argmax(axis=1)]
+    for r in range(key_len):
+        if key[r] is None:
+            key[r] = int(best[r])
+
+    key = bytes(key)
+    total = float((hists * SCORE[np.frombuffer(key, dtype=np.uint8)]).sum())
+    return key, total / max(1, int(hists.sum()))
+
+def recover_key(cipher, key_len: int = None, max_len: int = MAX_LEN, top: int = 5, cribs=None) -> bytes:
+    """
+    cipher : bytes ou tableau uint8 (p.ex. load_cipher()).
+    Sans key_len, les `top` longueurs détectées sont essayées et la clef qui
+    donne le clair le plus lisible est gardée. cribs : mots probables du clair.
+    """
+    if key_len is not None:
+        return recover_key_scored(cipher, key_len, cribs)[0]
+    cands = [recover_key_scored(cipher, L, cribs) for L, _ in rank_key_lengths(cipher, max_len, top)]
+    return max(cands, key=lambda ks: ks[1])[0]
+
+def decrypt(cipher, key: bytes) -> bytes:
+    # bytes ou tableau uint8 ; pour les gros fichiers voir xor_file (flux)
+    if isinstance(cipher, (bytes, bytearray)):
+        return xor_bytes(cipher, key)
+    return xor_array(cipher, key).tobytes()
 
 def main():
-    cipher = Path(CIPH_PATH).read_bytes()
-    key = recover_key(cipher)
+    ap = argparse.ArgumentParser()
+    ap.add_argument("path", nargs="?", default=CIPH_PATH)
+    ap.add_argument("--key-len", type=int, default=None, help="longueur connue (sinon détectée)")
+    ap.add_argument("--max-len", type=int, default=MAX_LEN)
+    ap.add_argument("--top", type=int, default=5, help="longueurs candidates essayées")
+    ap.add_argument("--crib", nargs="*", default=None,
+                    help="mots probables du clair (sans valeur : les cribs par défaut de crib.py)")
+    ap.add_argument("--bytes", type=int, default=None, help="n'utiliser que le début du chiffré")
+    args = ap.parse_args()
+    cribs = None if args.crib is None else (args.crib or list(CRIBS))
+
+    cipher = load_cipher(args.path)
+    if args.bytes:
+        cipher = cipher[:args.bytes]
+    if args.key_len is None:
+        ranked = rank_key_lengths(cipher, args.max_len, args.top)
+        print("Longueurs candidates:", ", ".join(f"{L} ({s:.3f})" for L, s in ranked))
+    key = recover_key(cipher, args.key_len, args.max_len, args.top, cribs)
     print("Recovered FLAG/key:\n", key.decode("ascii"), "\n")
 
     # (Optionnel) écrire le plaintext pour vérifier
     try:
-        pt = decrypt(cipher, key)
-        Path("recovered_plaintext.txt").write_bytes(pt)
+        xor_file(args.path, "recovered_plaintext.txt", key)
         print("Plaintext écrit dans recovered_plaintext.txt")
     except Exception as e:
         print("Déchiffrement/écriture du plaintext optionnel a échoué:", e)
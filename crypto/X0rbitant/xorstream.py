@@ -0,0 +1,88 @@
+# xorstream.py
+# XOR à clé répétée en flux, vectorisé.
+# La clef est répétée une fois pour toutes dans un tampon d'au moins
+# CHUNK + key_len octets. Pour un bloc qui commence à la phase p
+# (= position % key_len), la clef alignée est simplement tile[p:p+n] :
+# un seul np.bitwise_xor par bloc, aucun modulo par octet. La phase est
+# reportée d'un bloc à l'autre, et la mémoire reste constante (un bloc + le
+# tampon de clef), quelle que soit la taille de l'entrée.
+#
+#   python3 xorstream.py in.bin out.bin --key CTF{...}          # flux read/write
+#   python3 xorstream.py in.bin out.bin --key CTF{...} --mmap   # mmap entrée/sortie
+
+import argparse, os
+import numpy as np
+
+CHUNK = 1 << 24        # 16 MiB par bloc
+
+class KeyTile:
+    """Clef répétée sur chunk + len(key) octets ; at(phase, n) = clef alignée."""
+    def __init__(self, key: bytes, chunk: int = CHUNK):
+        if not key:
+            raise ValueError("empty key")
+        self.key = bytes(key)
+        self.n = len(key)
+        reps = -(-(chunk + self.n) // self.n)
+        self.tile = np.frombuffer(self.key * reps, dtype=np.uint8)
+        self.chunk = chunk
+
+    def at(self, phase: int, n: int) -> np.ndarray:
+        assert n <= self.chunk
+        return self.tile[phase:phase + n]
+
+def xor_array(src, key: bytes, phase: int = 0, out=None, chunk: int = CHUNK):
+    """src (tableau uint8, p.ex. memmap) XOR clef, bloc par bloc dans out ; renvoie out."""
+    kt = KeyTile(key, chunk)
+    if out is None:
+        out = np.empty(len(src), dtype=np.uint8)
+    for a in range(0, len(src), chunk):
+        b = min(a + chunk, len(src))
+        np.bitwise_xor(src[a:b], kt.at(phase, b - a), out=out[a:b])
+        phase = (phase + b - a) % kt.n
+    return out
+
+def xor_bytes(data: bytes, key: bytes, phase: int = 0) -> bytes:
+    return xor_array(np.frombuffer(data, dtype=np.uint8), key, phase).tobytes()
+
+def xor_stream(fin, fout, key: bytes, phase: int = 0, chunk: int = CHUNK) -> int:
+    """Fichiers binaires fin -> fout ; renvoie la phase finale (pour enchaîner)."""
+    kt = KeyTile(key, chunk)
+    buf = bytearray(chunk)
+    arr = np.frombuffer(buf, dtype=np.uint8)
+    mv = memoryview(buf)
+    while n := fin.readinto(buf):
+        np.bitwise_xor(arr[:n], kt.at(phase, n), out=arr[:n])
+        fout.write(mv[:n])
+        phase = (phase + n) % kt.n
+    return phase
+
+def xor_file(input_path: str, output_path: str, key: bytes, use_mmap: bool = False,
+             chunk: int = CHUNK) -> int:
+    """Chiffre/déchiffre un fichier ; renvoie le nombre d'octets traités."""
+    if not use_mmap:
+        with open(input_path, "rb") as fin, open(output_path, "wb") as fout:
+            xor_stream(fin, fout, key, 0, chunk)
+        return os.path.getsize(output_path)
+    size = os.path.getsize(input_path)
+    if size == 0:
+        open(output_path, "wb").close()
+        return 0
+    src = np.memmap(input_path, dtype=np.uint8, mode="r")
+    dst = np.memmap(output_path, dtype=np.uint8, mode="w+", shape=(size,))
+    xor_array(src, key, 0, dst, chunk)
+    dst.flush()
+    del src, dst
+    return size
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input")
+    ap.add_argument("output")
+    ap.add_argument("--key", default=os.getenv("FLAG", "CTF{example_flag}"))
+    ap.add_argument("--mmap", action="store_true")
+    args = ap.parse_args()
+    n = xor_file(args.input, args.output, args.key.encode("utf-8"), args.mmap)
+    print(f"{n} octets -> {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# keystream.py
+# Moteur générique de crib pour un keystream réutilisé.
+# Entrée : des paires (chiffré, clair connu avec trous) chiffrées avec le
+# même keystream. Pour chaque combinateur candidat C = f(P, K), on déduit
+# K = g(C, P) sur toutes les positions connues de toutes les paires d'un coup
+# (tableaux numpy (paires, longueur)), puis on compte les conflits : deux
+# paires connues à la même position qui donnent deux octets de keystream
+# différents. Le bon combinateur n'a aucun conflit. Avec une seule paire (ou
+# sans recouvrement), les candidats sans conflit sont départagés par la
+# lisibilité des autres chiffrés déchiffrés.
+#
+# Combinateurs : xor (C = P ^ K), affine C = a*P + K mod 256 pour tout a
+# impair (a = 1 : add, a = 255 : C = K - P) et sub C = P - K.
+#
+#   python3 keystream.py --pair <c_hex> "LOL*" --pair <c_hex> "CTF{?????...}"
+
+import argparse
+import numpy as np
+
+ODD = np.arange(1, 256, 2, dtype=np.uint8)
+INV = {int(a): pow(int(a), -1, 256) for a in ODD}
+
+def gapped(text, gap: str = "?", length: int = None):
+    """
+    Clair connu avec trous -> (octets, masque). gap marque un octet inconnu ;
+    un '*' final répète le motif jusqu'à length.
+    """
+    if text.endswith("*"):
+        unit = text[:-1]
+        if not unit:
+            raise ValueError("motif vide avant '*'")
+        if length is None or length < 0:
+            raise ValueError(f"{text!r} : un '*' final demande une longueur (length >= 0)")
+        text = (unit * (-(-length // len(unit))))[:length]
+    raw = np.frombuffer(text.encode("latin-1"), dtype=np.uint8)
+    mask = raw != ord(gap)
+    return np.where(mask, raw, 0).astype(np.uint8), mask
+
+class Combiner:
+    """C = f(P, K) ; infer() donne K à partir de C et P, decrypt() P à partir de C et K."""
+    def __init__(self, name, a=1):
+        self.name, self.a = name, a
+
+    def infer(self, C, P):
+        if self.name == "xor":
+            return C ^ P
+        if self.name == "sub":
+            return P - C
+        return C - np.uint8(self.a) * P
+
+    def decrypt(self, C, K):
+        if self.name == "xor":
+            return C ^ K
+        if self.name == "sub":
+            return C + K
+        return np.uint8(INV[self.a]) * (C - K)
+
+    def __repr__(self):
+        if self.name == "affine":
+            return {1: "add", 255: "rsub"}.get(self.a, f"affine(a={self.a})")
+        return self.name
+
+COMBINERS = [Combiner("xor"), Combiner("affine", 1), Combiner("sub"), Combiner("affine", 255)] + \
+            [Combiner("affine", int(a)) for a in ODD if a not in (1, 255)]
+
+def stack(pairs):
+    """[(ct, (plain, mask))] -> C, P, M (paires, longueur max), complétés par des inconnus."""
+    n, L = len(pairs), max(len(ct) for ct, _ in pairs)
+    C = np.zeros((n, L), dtype=np.uint8)
+    P = np.zeros((n, L), dtype=np.uint8)
+    M = np.zeros((n, L), dtype=bool)
+    for i, (ct, (plain, mask)) in enumerate(pairs):
+        ct = np.frombuffer(bytes(ct), dtype=np.uint8)
+        m = min(len(ct), len(plain))
+        C[i, :len(ct)] = ct
+        P[i, :m] = plain[:m]
+        M[i, :m] = mask[:m]
+    return C, P, M
+
+def merge(K, M):
+    """Keystream fusionné (premier connu par colonne), masque connu, conflits, recouvrements."""
+    known = M.sum(axis=0)
+    kmin = np.where(M, K, 255).min(axis=0)
+    kmax = np.where(M, K, 0).max(axis=0)
+    conflicts = int(((known >= 2) & (kmin != kmax)).sum())
+    overlaps = int((known >= 2).sum())
+    return kmax, known > 0, conflicts, overlaps
+
+def readability(pt, mask):
+    """Part d'octets ASCII imprimables parmi les octets déchiffrés."""
+    sel = pt[mask]
+    if not sel.size:
+        return 0.0
+    ok = ((sel >= 32) & (sel <= 126)) | (sel == 9) | (sel == 10) | (sel == 13)
+    return float(ok.mean())
+
+def detect(pairs, combiners=COMBINERS):
+    """
+    Classe les combinateurs : [(combiner, keystream, known, conflicts, overlaps, lisibilité)],
+    le meilleur d'abord (0 conflit, puis le plus de recouvrements, puis le plus lisible).
+    """
+    C, P, M = stack(pairs)
+    ranked = []
+    for comb in combiners:
+        K, known, conflicts, overlaps = merge(comb.infer(C, P), M)
+        # positions de chiffré couvertes par le keystream mais pas par le clair connu
+        gaps = known[None, :] & ~M & (np.arange(C.shape[1]) < np.array([len(ct) for ct, _ in pairs])[:, None])
+        read = readability(comb.decrypt(C, K[None, :]), gaps)
+        ranked.append((comb, K, known, conflicts, overlaps, read))
+    order = sorted(range(len(ranked)), key=lambda i: (ranked[i][3], -ranked[i][4], -ranked[i][5], i))
+    return [ranked[i] for i in order]
+
+def decrypt_many(cts, comb, K, known):
+    """
+    Déchiffre une matrice (n, L) de chiffrés (ou une liste de bytes) d'un seul
+    coup ; renvoie (clairs, masque des octets dont le keystream est connu).
+    """
+    lens = None
+    if not isinstance(cts, np.ndarray):
+        lens = np.array([len(c) for c in cts])
+        mat = np.zeros((len(cts), lens.max()), dtype=np.uint8)
+        for i, c in enumerate(cts):
+            mat[i, :len(c)] = np.frombuffer(bytes(c), dtype=np.uint8)
+        cts = mat
+    L = min(cts.shape[1], len(K))
+    mask = np.broadcast_to(known[:L], (len(cts), L))
+    if lens is not None:
+        mask = mask & (np.arange(L) < lens[:, None])
+    return comb.decrypt(cts[:, :L], K[None, :L]), mask
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pair", nargs=2, action="append", metavar=("CT_HEX", "PLAIN"), required=True,
+                    help="chiffré hex et clair connu ('?' = inconnu, '*' final = répéter)")
+    ap.add_argument("--decrypt", nargs="*", default=[], help="autres chiffrés hex à déchiffrer")
+    ap.add_argument("--top", type=int, default=3)
+    args = ap.parse_args()
+
+    pairs = []
+    for ct_hex, plain in args.pair:
+        ct = bytes.fromhex(ct_hex)
+        pairs.append((ct, gapped(plain, length=len(ct))))
+    ranked = detect(pairs)
+    for comb, K, known, conflicts, overlaps, read in ranked[:args.top]:
+        print(f"{comb!r:16s} conflits {conflicts:4d}  recouvrements {overlaps:4d}  "
+              f"lisible {read:.3f}  keystream connu {int(known.sum())}/{len(K)}")
+    comb, K, known = ranked[0][:3]
+    cts = [ct for ct, _ in pairs] + [bytes.fromhex(h) for h in args.decrypt]
+    pts, mask = decrypt_many(cts, comb, K, known)
+    for ct, pt, m in zip(cts, pts, mask):
+        pt, m = pt[:len(ct)], m[:len(ct)]
+        print("".join(chr(b) if k and 32 <= b < 127 else ("." if k else "?") for b, k in zip(pt, m)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+# oracle_client.py
+# Client pour l'oracle à clair choisi de baby_crib (asyncio).
+# - une ou plusieurs connexions persistantes ; chaque réponse est lue avec
+#   StreamReader.readline (tampon, pas d'attente sur timeout)
+# - pipeline : toutes les requêtes d'un lot sont écrites avant de lire les
+#   réponses, qui reviennent dans l'ordre
+# - le keystream déduit de chaque réponse est mis en cache par offset : un
+#   offset connu n'est jamais redemandé
+# - le combinateur (xor / add / sub / affine) est identifié avec des clairs
+#   choisis ("A"*n, "B"*n, "a"*n) et keystream.detect
+#
+# Protocole supposé (celui d'oracle_server.py) : une ligne "c_flag:c_lol" à la
+# connexion, puis une ligne de clair -> une ligne de chiffré hex. --mode reset :
+# chaque requête repart de l'offset 0 ; --mode continue : la position avance.
+#
+#   python3 oracle_server.py --port 9280 --mode continue --delay 0.01 &
+#   python3 oracle_client.py --host 127.0.0.1 --mode continue --conns 2 --extra 4096
+
+import argparse, asyncio, sys, time
+import numpy as np
+from keystream import detect
+
+HOST = "ctf.ac.upt.ro"
+PORT = 9280
+FILLER = ord("A")
+PROBES = (b"A", b"B", b"a")
+
+class KeystreamCache:
+    """Octets de keystream connus, indexés par offset absolu."""
+    def __init__(self):
+        self.K = np.zeros(0, dtype=np.uint8)
+        self.known = np.zeros(0, dtype=bool)
+
+    def _grow(self, n):
+        if n > len(self.K):
+            self.K = np.concatenate([self.K, np.zeros(n - len(self.K), dtype=np.uint8)])
+            self.known = np.concatenate([self.known, np.zeros(n - len(self.known), dtype=bool)])
+
+    def put(self, offset, ks):
+        self._grow(offset + len(ks))
+        self.K[offset:offset + len(ks)] = ks
+        self.known[offset:offset + len(ks)] = True
+
+    def missing(self, a, b):
+        """Intervalles [s, e) de [a, b) encore inconnus."""
+        self._grow(b)
+        hole = ~self.known[a:b]
+        if not hole.any():
+            return []
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], hole.view(np.int8), [0]])))
+        return [(a + int(s), a + int(e)) for s, e in zip(edges[::2], edges[1::2])]
+
+    def get(self, a, b):
+        return None if self.missing(a, b) else self.K[a:b].copy()
+
+class Conn:
+    """Une connexion persistante ; pos = offset de keystream de la prochaine requête."""
+    def __init__(self, reader, writer, banner, timeout):
+        self.reader, self.writer, self.banner, self.timeout = reader, writer, banner, timeout
+        self.pos = 0
+        self.lock = asyncio.Lock()
+
+    @classmethod
+    async def open(cls, host, port, timeout):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        banner = await asyncio.wait_for(reader.readline(), timeout)
+        return cls(reader, writer, banner.decode(errors="replace").strip(), timeout)
+
+    async def query(self, pts, pipeline=True):
+        """Chiffrés de pts (bytes sans '\\n'), dans l'ordre."""
+        async with self.lock:
+            out = []
+            if pipeline:
+                self.writer.write(b"".join(p + b"\n" for p in pts))
+                await self.writer.drain()
+                for _ in pts:
+                    out.append(await self._reply())
+            else:
+                for p in pts:
+                    self.writer.write(p + b"\n")
+                    await self.writer.drain()
+                    out.append(await self._reply())
+            return out
+
+    async def _reply(self):
+        line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+        if not line:
+            raise ConnectionError("oracle closed the connection")
+        return bytes.fromhex(line.decode().strip())
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except OSError:
+            pass
+
+class OracleClient:
+    def __init__(self, host=HOST, port=PORT, conns=1, mode="reset", chunk=1024, timeout=10.0,
+                 pipeline=True):
+        self.host, self.port, self.nconns, self.mode = host, port, conns, mode
+        self.chunk, self.timeout, self.pipeline = chunk, timeout, pipeline
+        self.conns = []
+        self.cache = KeystreamCache()
+        self.comb = None
+        self.queries = self.sent = 0
+
+    async def start(self):
+        self.conns = list(await asyncio.gather(*(self._open() for _ in range(self.nconns))))
+        return self.conns[0].banner
+
+    async def _open(self):
+        return await Conn.open(self.host, self.port, self.timeout)
+
+    async def close(self):
+        await asyncio.gather(*(c.close() for c in self.conns))
+
+    async def _ask(self, conn, pts):
+        """Envoie pts sur conn ; renvoie [(offset, clair, chiffré)]."""
+        self.queries += len(pts)
+        self.sent += sum(map(len, pts))
+        cts = await conn.query(pts, self.pipeline)
+        out = []
+        for p, c in zip(pts, cts):
+            out.append((conn.pos, p, c))
+            if self.mode == "continue":
+                conn.pos += len(p)
+        return out
+
+    def _store(self, replies):
+        for off, p, c in replies:
+            P = np.frombuffer(p, dtype=np.uint8)
+            C = np.frombuffer(c, dtype=np.uint8)
+            self.cache.put(off, self.comb.infer(C, P))
+
+    async def probe(self, n=64):
+        """Identifie le combinateur avec des clairs choisis au même offset."""
+        if self.mode == "reset":
+            replies = await self._ask(self.conns[0], [p * n for p in PROBES])
+        else:
+            # chaque sonde sur une connexion neuve, pour qu'elles partagent l'offset 0
+            fresh = list(await asyncio.gather(*(self._open() for _ in PROBES)))
+            replies = [r for conn, p in zip(fresh, PROBES) for r in await self._ask(conn, [p * n])]
+            self.conns.extend(fresh)
+        pairs = []
+        for off, p, c in replies:
+            ct = bytes(off) + c
+            plain = np.zeros(len(ct), dtype=np.uint8)
+            mask = np.zeros(len(ct), dtype=bool)
+            plain[off:] = np.frombuffer(p, dtype=np.uint8)
+            mask[off:] = True
+            pairs.append((ct, (plain, mask)))
+        ranked = detect(pairs)
+        self.comb = ranked[0][0]
+        if ranked[0][3]:
+            raise ValueError(f"aucun combinateur cohérent (meilleur : {self.comb!r}, {ranked[0][3]} conflits)")
+        self._store(replies)
+        return self.comb
+
+    async def keystream(self, a, b):
+        """Keystream [a, b) ; ne demande que les offsets absents du cache."""
+        gaps = self.cache.missing(a, b)
+        if gaps:
+            if self.mode == "reset":
+                # toute requête couvre [0, len) : une seule ligne jusqu'à la fin du dernier trou
+                self._store(await self._ask(self.conns[0], [bytes([FILLER]) * gaps[-1][1]]))
+            else:
+                await asyncio.gather(*(self._advance(s, e) for s, e in gaps))
+        return self.cache.get(a, b)
+
+    async def _advance(self, s, e):
+        """Mode continue : une connexion avance jusqu'à couvrir [s, e), requêtes en pipeline."""
+        usable = [c for c in self.conns if c.pos <= s and not c.lock.locked()]
+        conn = max(usable, key=lambda c: c.pos) if usable else await self._open()
+        if not usable:
+            self.conns.append(conn)
+        pts = []
+        pos = conn.pos
+        while pos < e:
+            n = min(self.chunk, e - pos)
+            pts.append(bytes([FILLER]) * n)
+            pos += n
+        self._store(await self._ask(conn, pts))
+
+    def decrypt(self, ct, offset=0):
+        K = self.cache.get(offset, offset + len(ct))
+        if K is None:
+            return None
+        return self.comb.decrypt(np.frombuffer(ct, dtype=np.uint8), K).tobytes()
+
+async def run(args):
+    t0 = time.perf_counter()
+    client = OracleClient(args.host, args.port, args.conns, args.mode, args.chunk, args.timeout,
+                          not args.no_pipeline)
+    banner = await client.start()
+    try:
+        a, b = banner.split(":", 1)
+        c_flag = bytes.fromhex(min(a, b, key=len).strip())
+        comb = await client.probe()
+        print(f"[*] combinateur : {comb!r}", file=sys.stderr)
+        await client.keystream(0, len(c_flag))
+        flag = client.decrypt(c_flag).decode("latin-1")
+        if args.extra:
+            await client.keystream(0, args.extra)
+            await client.keystream(0, args.extra)          # déjà en cache : aucune requête
+        print(flag)
+        if args.submit:
+            conn = client.conns[0]
+            conn.writer.write(flag.encode() + b"\n")
+            await conn.writer.drain()
+            resp = await asyncio.wait_for(conn.reader.readline(), args.timeout)
+            print(resp.decode(errors="replace").strip())
+    finally:
+        await client.close()
+    print(f"[*] {client.queries} requêtes, {client.sent} octets envoyés, "
+          f"{int(client.cache.known.sum())} octets de keystream en cache, "
+          f"{len(client.conns)} connexions, {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+    return flag
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--conns", type=int, default=1, help="connexions persistantes")
+    ap.add_argument("--mode", choices=("reset", "continue"), default="reset",
+                    help="reset : chaque requête repart de l'offset 0 ; continue : la position avance")
+    ap.add_argument("--chunk", type=int, default=1024, help="octets par requête (mode continue)")
+    ap.add_argument("--timeout", type=float, default=10.0)
+    ap.add_argument("--extra", type=int, default=0, help="récupérer aussi le keystream [0, extra)")
+    ap.add_argument("--no-pipeline", action="store_true", help="attendre chaque réponse (comparaison)")
+    ap.add_argument("--submit", action="store_true", help="renvoyer le flag au service")
+    args = ap.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# oracle_server.py
+# Oracle local qui imite le service baby_crib pour tester oracle_client.py.
+# À la connexion : une ligne "c_flag:c_lol" (flag et "LOL"*100 chiffrés avec
+# le même keystream). Ensuite, chaque ligne envoyée est chiffrée et renvoyée
+# en hex. Le keystream vient d'une clef secrète (SHA-256 en mode compteur) ;
+# --mode reset : chaque requête repart de l'offset 0 (réutilisation du
+# keystream, comme pour les deux messages), --mode continue : la position
+# avance au fil des requêtes d'une même connexion.
+#
+#   python3 oracle_server.py --port 9280 --combiner add &
+#   python3 oracle_client.py --host 127.0.0.1 --port 9280
+
+import argparse, asyncio, hashlib, os, random
+
+def make_flag():
+    return "CTF{" + os.urandom(32).hex() + "}"
+
+class Cipher:
+    def __init__(self, key: bytes, combiner: str = "add"):
+        self.key = key
+        self.combiner = combiner
+        self.a = int(combiner.split(":")[1]) if combiner.startswith("affine:") else 1
+        assert self.a % 2 == 1
+        self.ks = b""
+
+    def keystream(self, a, b):
+        while len(self.ks) < b:
+            self.ks += hashlib.sha256(self.key + len(self.ks).to_bytes(8, "big")).digest()
+        return self.ks[a:b]
+
+    def encrypt(self, pt: bytes, offset: int = 0) -> bytes:
+        ks = self.keystream(offset, offset + len(pt))
+        if self.combiner == "xor":
+            return bytes(p ^ k for p, k in zip(pt, ks))
+        if self.combiner == "sub":
+            return bytes((p - k) % 256 for p, k in zip(pt, ks))
+        return bytes((self.a * p + k) % 256 for p, k in zip(pt, ks))
+
+async def handle(reader, writer, cipher, flag, mode, delay, latency):
+    banner = f"{cipher.encrypt(flag.encode()).hex()}:{cipher.encrypt(b'LOL' * 100).hex()}\n"
+    pos = 0
+    try:
+        writer.write(banner.encode())
+        await writer.drain()
+        while line := await reader.readline():
+            pt = line.rstrip(b"\r\n")
+            if not pt:
+                break
+            if pt == flag.encode():
+                writer.write(b"Correct!\n")
+                break
+            if delay:
+                await asyncio.sleep(random.uniform(0, delay))
+            reply = cipher.encrypt(pt, pos).hex().encode() + b"\n"
+            if latency:
+                # latence réseau : la réponse part plus tard, la ligne suivante est lue tout de suite
+                asyncio.get_running_loop().call_later(latency, writer.write, reply)
+            else:
+                writer.write(reply)
+                await writer.drain()
+            if mode == "continue":
+                pos += len(pt)
+    except ConnectionError:
+        pass
+    finally:
+        if latency:
+            await asyncio.sleep(latency)         # laisser partir les réponses en attente
+        writer.close()
+
+async def serve(args):
+    cipher = Cipher(os.urandom(16), args.combiner)
+    flag = args.flag or make_flag()
+    server = await asyncio.start_server(
+        lambda r, w: handle(r, w, cipher, flag, args.mode, args.delay, args.latency), args.host, args.port)
+    print(f"[*] oracle on {args.host}:{args.port} ({args.combiner}, {args.mode}), flag {flag}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9280)
+    ap.add_argument("--flag", default=None)
+    ap.add_argument("--combiner", default="add", help="xor, add, sub ou affine:<a impair>")
+    ap.add_argument("--mode", choices=("reset", "continue"), default="reset")
+    ap.add_argument("--delay", type=float, default=0.0, help="temps de traitement aléatoire max par requête (s)")
+    ap.add_argument("--latency", type=float, default=0.0, help="latence réseau fixe par réponse (s)")
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
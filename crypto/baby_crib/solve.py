@@ -2,24 +2,30 @@
 import argparse
 import socket
 import sys
+from keystream import decrypt_many, detect, gapped
 
-def mod_sub(b1, b2):
-    return bytes((x - y) % 256 for x, y in zip(b1, b2))
+FLAG_PATTERN = "CTF{" + "?" * 64 + "}"
 
-def recover_flag(c_flag_hex: str, c_lol_hex: str) -> str:
+def recover_flag(c_flag_hex: str, c_lol_hex: str, crib: str = "LOL*", verbose: bool = False) -> str:
     c_flag = bytes.fromhex(c_flag_hex.strip())
     c_lol  = bytes.fromhex(c_lol_hex.strip())
 
-    # plaintext connu = "LOL" répété
-    if len(c_lol) % 3 != 0:
-        raise ValueError("lol.hex n'a pas une longueur multiple de 3 (LOL répété)")
-    crib = (b"LOL" * (len(c_lol)//3))
+    # plaintext connu = "LOL" répété ; le format du flag donne 5 octets connus de
+    # plus sur l'autre chiffré, ce qui départage xor / add / sub / affine
+    pairs = [(c_lol, gapped(crib, length=len(c_lol)))]
+    if len(c_flag) == len(FLAG_PATTERN):
+        pairs.append((c_flag, gapped(FLAG_PATTERN)))
+    ranked = detect(pairs)
+    comb, K, known, conflicts = ranked[0][:4]
+    if verbose:
+        print(f"[*] combinateur : {comb!r} ({conflicts} conflits, suivant : {ranked[1][0]!r} "
+              f"avec {ranked[1][3]})", file=sys.stderr)
+    if len(K) < len(c_flag) or not known[:len(c_flag)].all():
+        raise ValueError("le crib ne couvre pas tout le flag")
 
-    # Keystream K = C_lol - crib (mod 256)
-    K = mod_sub(c_lol, crib)
-
-    # Decrypt flag = C_flag - K (mod 256)
-    p_flag = mod_sub(c_flag, K[:len(c_flag)])
+    # Decrypt flag avec le keystream déduit
+    pts, _ = decrypt_many([c_flag], comb, K, known)
+    p_flag = pts[0].tobytes()
 
     try:
         return p_flag.decode("ascii")
@@ -38,20 +44,13 @@ def looks_like_hex_pair(s: str) -> bool:
             all(ch in hexchars for ch in b.strip()) and
             len(a.strip()) % 2 == 0 and len(b.strip()) % 2 == 0)
 
-def recv_line(sock: socket.socket, timeout=2.0) -> str:
-    sock.settimeout(timeout)
-    data = b""
+def recv_line(rfile) -> str:
+    # lecture tamponnée (sock.makefile) : rend la ligne dès que '\n' arrive,
+    # le timeout de la socket ne joue que si le service se tait
     try:
-        while True:
-            chunk = sock.recv(4096)
-            if not chunk:
-                break
-            data += chunk
-            if b"\n" in data or b"\r" in data:
-                break
+        return rfile.readline().decode(errors="ignore").strip()
     except socket.timeout:
-        pass
-    return data.decode(errors="ignore").strip()
+        return ""
 
 def main():
     parser = argparse.ArgumentParser(description="Baby crib solver")
@@ -60,15 +59,28 @@ def main():
     parser.add_argument("--flag-file", default="flag.hex", help="fallback local file")
     parser.add_argument("--lol-file", default="lol.hex", help="fallback local file")
     parser.add_argument("--no-net", action="store_true", help="ne pas se connecter; mode offline pur")
+    parser.add_argument("--oracle", action="store_true",
+                        help="clairs choisis via oracle_client.py (connexions persistantes, pipeline)")
+    parser.add_argument("--crib", default="LOL*", help="clair connu du long message ('?' = inconnu, '*' = répéter)")
     args = parser.parse_args()
 
+    if args.oracle:
+        import asyncio
+        from oracle_client import run
+        asyncio.run(run(argparse.Namespace(host=args.host, port=args.port, conns=1, mode="reset",
+                                           chunk=1024, timeout=10.0, extra=0, no_pipeline=False,
+                                           submit=True)))
+        return
+
     c_flag_hex = c_lol_hex = None
-    sock = None
+    sock = rfile = None
 
     if not args.no_net:
         try:
             sock = socket.create_connection((args.host, args.port), timeout=5)
-            line = recv_line(sock, timeout=2.0)
+            sock.settimeout(2.0)
+            rfile = sock.makefile("rb")
+            line = recv_line(rfile)
             if looks_like_hex_pair(line):
                 a, b = line.split(":", 1)
                 # on suppose que le plus court est le flag (69 octets dans l'énoncé)
@@ -91,14 +103,14 @@ def main():
             print(f"[!] Impossible de lire {args.flag_file} / {args.lol_file}: {e}", file=sys.stderr)
             sys.exit(1)
 
-    flag = recover_flag(c_flag_hex, c_lol_hex)
+    flag = recover_flag(c_flag_hex, c_lol_hex, args.crib, verbose=True)
     print(flag)
 
     # Optionnel: renvoyer le flag au service si on est connecté et que ça peut valider
     if sock:
         try:
             sock.sendall(flag.encode() + b"\n")
-            resp = recv_line(sock, timeout=2.0)
+            resp = recv_line(rfile)
             if resp:
                 print(resp)
             sock.close()
@@ -0,0 +1,56 @@
+# batch_decrypt.py
+# Decrypt every sample block at once and majority-vote the plaintext.
+# All leak windows are packed into one (blocks x 32*W bits) matrix and the
+# 69*8 predictors into one weight matrix; every keystream bit of every block is
+# then the parity of a row/column product, i.e. one packed GF(2) matmul.
+# With bit 8*off+bit per predictor, each packed output row is already the
+# block's keystream bytes.
+
+import numpy as np
+from gf2 import nwords, pack_le, pack_rows, matmul_m4ri, transpose_bits
+
+def window_rows(leaks, W):
+    """
+    Packed feature rows for every block j with a full window: row for block j
+    is leaks[3j-W:3j] (untempered, oldest first), as in main().
+    Returns (blocks, rows); both empty when no block has a full window.
+    """
+    leaks = np.asarray(leaks, dtype=np.uint32)
+    j0 = -(-W // 3)
+    blocks = np.arange(j0, len(leaks) // 3)
+    if not len(blocks):
+        return np.arange(0), np.zeros((0, nwords(32*W)), dtype="<u8")
+    wins = np.lib.stride_tricks.sliding_window_view(leaks, W)[3*blocks - W]
+    return blocks, pack_le(wins)
+
+def predictor_matrix(predictors, W):
+    """Packed (32*W x 8*FLAG_LEN) weights: column 8*off+bit = predictors[off][bit]."""
+    flat = [w for weights in predictors for w in weights]
+    return transpose_bits(pack_rows(flat, 32*W), len(flat), 32*W)
+
+def batch_keystreams(predictors, W, leaks):
+    """Keystream bytes (blocks x FLAG_LEN) for every block with a full window."""
+    blocks, X = window_rows(leaks, W)
+    ks = matmul_m4ri(X, predictor_matrix(predictors, W), 32*W)
+    return blocks, ks.view(np.uint8)[:, :len(predictors)]
+
+def batch_decrypt(predictors, W, leaks, cts):
+    """
+    Plaintext candidates (blocks x FLAG_LEN) for every decryptable block.
+    cts: list of bytes, or a (samples x width) uint8 matrix (SampleStore.ct).
+    """
+    blocks, ks = batch_keystreams(predictors, W, leaks)
+    if not len(blocks):
+        return blocks, np.zeros((0, ks.shape[1]), dtype=np.uint8)
+    if isinstance(cts, np.ndarray):
+        ct = np.asarray(cts[blocks])
+    else:
+        ct = np.frombuffer(b"".join(cts[j] for j in blocks), dtype=np.uint8).reshape(len(blocks), -1)
+    return blocks, ct[:, :ks.shape[1]] ^ ks
+
+def majority_vote(pts):
+    """Per-position most common byte and its vote count."""
+    n, L = pts.shape
+    counts = np.bincount((np.arange(L) * 256 + pts).ravel(), minlength=256*L).reshape(L, 256)
+    winner = counts.argmax(axis=1).astype(np.uint8)
+    return winner.tobytes(), counts.max(axis=1)
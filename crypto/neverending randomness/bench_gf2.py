@@ -0,0 +1,59 @@
+# bench_gf2.py
+# Compare the baseline Python-int gauss_gf2 (gf2.gauss_gf2_py, the function
+# from the original solve_final.py unchanged) with the packed M4RI backend on
+# the system shapes train_byte_predictors produces: S = 32*W + 50 rows, 32*W
+# columns. Both backends must return the same solutions.
+#
+# Usage: python bench_gf2.py [--W 32 128 256] [--skip-py-above 128]
+
+import argparse, random, time
+from gf2 import gauss_gf2_py, gauss_gf2, GF2Factor, M4RIFactor, pack_rows
+
+def timed(fn, *args):
+    t = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--W", type=int, nargs="+", default=[32, 128, 256])
+    ap.add_argument("--rhs", type=int, default=8*69, help="right-hand sides for the factor benchmark")
+    ap.add_argument("--skip-py-above", type=int, default=None, help="skip the Python-int backend for larger W")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'W':>5} {'rows x cols':>13} {'MiB int':>8} {'MiB packed':>10} "
+          f"{'py gauss':>9} {'m4ri gauss':>10} {'speedup':>8} {'py factor+solve':>16} {'m4ri factor+solve':>18}")
+    for W in args.W:
+        n = 32*W
+        m = n + 50
+        A = [rng.getrandbits(n) for _ in range(m)]
+        b = [rng.getrandbits(1) for _ in range(m)]
+        B = [rng.getrandbits(args.rhs) for _ in range(m)]
+        mib_int = sum(r.__sizeof__() for r in A) / 2**20
+        mib_packed = pack_rows(A, n).nbytes / 2**20
+
+        w_np, t_np = timed(gauss_gf2, A, b, n)
+        f_np, tf_np = timed(M4RIFactor, A, n)
+        sols_np, ts_np = timed(f_np.solve_many, B, args.rhs)
+
+        if args.skip_py_above is not None and W > args.skip_py_above:
+            t_py_s = tfs_py_s = "skipped"
+            speed = "-"
+        else:
+            w_py, t_py = timed(gauss_gf2_py, A, b, n)
+            if w_py != w_np:
+                raise SystemExit(f"W={W}: gauss_gf2 solutions differ between backends")
+            f_py, tf_py = timed(GF2Factor, A, n)
+            sols_py, ts_py = timed(f_py.solve_many, B, args.rhs)
+            if sols_py != sols_np:
+                raise SystemExit(f"W={W}: solve_many solutions differ between backends")
+            t_py_s = f"{t_py:.2f}s"
+            tfs_py_s = f"{tf_py + ts_py:.2f}s"
+            speed = f"{t_py / t_np:.1f}x"
+        print(f"{W:>5} {f'{m}x{n}':>13} {mib_int:>8.1f} {mib_packed:>10.1f} "
+              f"{t_py_s:>9} {f'{t_np:.2f}s':>10} {speed:>8} {tfs_py_s:>16} {f'{tf_np + ts_np:.2f}s':>18}")
+
+if __name__ == "__main__":
+    main()
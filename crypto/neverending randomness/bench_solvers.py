@@ -0,0 +1,236 @@
+# bench_solvers.py
+# Benchmark the neverending-randomness solvers on synthetic challenges.
+# A local generator reproduces the service: one contiguous MT19937 stream,
+# per connection 69 keystream bytes XOR the flag, then three leaked tempered
+# words. Every (solver, sample count, trial) runs in a fresh process; each
+# solver stage (load / train / solve / decrypt) is timed, peak RSS is taken
+# from the child, and success means the exact flag came out ("n/a" for a
+# pipeline with no decrypt stage that ran without error). Results are
+# written as JSON for regression tracking (default: bench_solvers.json in the
+# system temp directory, outside the tree).
+# Each pipeline follows its solver's main(): "final" / "final-exact" decrypt one
+# block like solve_final.py (with --exact), "final-batch" is solve_final.py
+# --batch (every block, majority vote); solve_final_v2.py's neighbour-block
+# retry is left out.
+#
+#   python3 bench_solvers.py --samples 250 400 --trials 3 --out /tmp/bench.json
+
+import argparse, json, os, platform, resource, secrets, tempfile, time
+from contextlib import contextmanager
+import multiprocessing as mp
+import numpy as np
+
+FLAG_LEN = 69
+K = FLAG_LEN + 3
+SOLVERS = ("final", "final-batch", "final-exact", "final_v2", "neverending", "online")
+
+def make_samples(path, n, seed, tempered=True, pid=7):
+    """n connections of a synthetic challenge; returns the flag."""
+    from mt_np import MT19937, temper
+    flag = ("CTF{" + secrets.token_hex(32) + "}").encode()
+    ys = MT19937.from_seed(seed).untempered(K * n).reshape(n, K)
+    ks = (temper(ys[:, :FLAG_LEN]) >> np.uint32(24)) if tempered else (ys[:, :FLAG_LEN] & np.uint32(0xFF))
+    cts = np.frombuffer(flag, dtype=np.uint8) ^ ks.astype(np.uint8)
+    leaks = temper(ys[:, FLAG_LEN:])
+    with open(path, "w") as f:
+        for ct, lk in zip(cts, leaks.tolist()):
+            f.write(repr({"ciphertext_hex": ct.tobytes().hex(), "leak32": lk, "pid": pid}) + "\n")
+    return flag
+
+class Stages:
+    def __init__(self):
+        self.times = {}
+
+    @contextmanager
+    def __call__(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - t0
+
+# -------------------- solver pipelines (mirror each main()) --------------------
+
+def _load(path, stage):
+    import sample_store
+    from mt_np import untemper
+    with stage("load"):
+        samples = sample_store.load(path)
+        return samples, untemper(samples.leak32).ravel().tolist(), samples.ciphertexts()
+
+def _single_block(apply_predictor, predictors, W, leaks, cts, j_min, stage):
+    """The default path of solve_final(_v2).main: one block with j_min blocks of history."""
+    D = len(leaks)
+    j = max((W + 2)//3, j_min)
+    if 3*j > D:
+        j = D//3 - 1
+        if j < (W + 2)//3:
+            return None
+    with stage("solve"):
+        window = leaks[3*j - W:3*j]
+        ks = bytes(apply_predictor(predictors[off], W, window) for off in range(FLAG_LEN))
+    with stage("decrypt"):
+        return bytes(a ^ b for a, b in zip(cts[j], ks))
+
+def run_final(path, stage, cache):
+    import solve_final as sf
+    samples, leaks, cts = _load(path, stage)
+    with stage("train"):
+        predictors, W = sf.train_byte_predictors(W=32, S=1300, ref_len=120000, cache=cache)
+    return _single_block(sf.apply_predictor, predictors, W, leaks, cts, 20, stage)
+
+def run_final_batch(path, stage, cache):
+    import solve_final as sf
+    from batch_decrypt import batch_keystreams, majority_vote
+    samples, leaks, cts = _load(path, stage)
+    with stage("train"):
+        predictors, W = sf.train_byte_predictors(W=32, S=1300, ref_len=120000, cache=cache)
+    with stage("solve"):
+        blocks, ks = batch_keystreams(predictors, W, leaks)
+    with stage("decrypt"):
+        if not len(blocks):
+            return None
+        pts = np.asarray(samples.ct[blocks])[:, :ks.shape[1]] ^ ks
+        return majority_vote(pts)[0]
+
+def run_final_exact(path, stage, cache, tempered):
+    import predictor_cache, solve_final as sf
+    samples, leaks, cts = _load(path, stage)
+    with stage("train"):
+        predictors, W = predictor_cache.exact_predictors(sf.EXACT_W, K, FLAG_LEN, tempered, cache=cache)
+    return _single_block(sf.apply_predictor, predictors, W, leaks, cts, 20, stage)
+
+def run_final_v2(path, stage, cache):
+    import solve_final_v2 as v2
+    samples, leaks, cts = _load(path, stage)
+    with stage("train"):
+        predictors, W = v2.train_byte_predictors(W=256, S=9000, ref_len=1000000, cache=cache)
+    return _single_block(v2.apply_predictor, predictors, W, leaks, cts, 90, stage)
+
+def run_neverending(path, stage, cache):
+    # solve_neverending stops after the per-lane LFSR fit; it has no decrypt stage
+    import sample_store, solve_neverending as sn
+    with stage("load"):
+        samples = sample_store.load(path)
+        decim = [sn.untemper(x) for x in samples.leak32.ravel().tolist()]
+    with stage("solve"):
+        target = max(624, len(decim))
+        for i in range(32):
+            bits = [(w >> i) & 1 for w in decim]
+            C, L = sn.fit_lfsr_coeffs(bits)
+            sn.extend_lfsr(C, bits[:], target - len(bits))
+    return None
+
+def run_online(path, stage, cache):
+    import sample_store, solve_online as so
+    with stage("load"):
+        samples = sample_store.load(path)
+        cts = samples.ciphertexts()
+        leaks = samples.leak32.tolist()
+    stream, system = so.SymbolicStream(), so.OnlineSystem()
+    with stage("solve"):
+        for s in range(0, len(cts), 16):
+            rows = [so.leak_rows(stream, i, leaks[i]) for i in range(s, min(s + 16, len(cts)))]
+            system.add(np.vstack(rows))
+            if system.rank >= so.MAX_RANK:
+                break
+    if system.rank < so.MAX_RANK:
+        return None
+    with stage("decrypt"):
+        return so.decrypt_all(system.state_words(), cts, leaks)[1]
+
+PIPELINES = {"final": run_final, "final-batch": run_final_batch, "final-exact": run_final_exact,
+             "final_v2": run_final_v2, "neverending": run_neverending, "online": run_online}
+KEYSTREAM_AWARE = {"final-exact"}       # pipelines told which keystream byte the samples use
+NO_DECRYPT = {"neverending"}            # timing only: success is n/a unless the run errors
+
+def run_one(solver, path, flag, tempered, cache):
+    """Child process entry: one timed run, peak RSS of this process."""
+    import contextlib, io
+    stage = Stages()
+    err, pt = None, None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            extra = (tempered,) if solver in KEYSTREAM_AWARE else ()
+            pt = PIPELINES[solver](path, stage, cache, *extra)
+    except Exception as e:
+        err = f"{type(e).__name__}: {e}"
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    success = None if solver in NO_DECRYPT and err is None else pt == flag
+    return {"stages": stage.times, "total": sum(stage.times.values()), "peak_rss_mb": round(peak, 1),
+            "success": success, "plaintext": pt.decode("latin-1") if pt else None, "error": err}
+
+def _status(success):
+    return "n/a " if success is None else "OK  " if success else "FAIL"
+
+def summarize(results):
+    out = {}
+    for r in results:
+        key = f"{r['solver']}@{r['samples']}"
+        s = out.setdefault(key, {"solver": r["solver"], "samples": r["samples"], "runs": 0,
+                                 "scored": 0, "successes": 0, "stages": {}, "total": 0.0,
+                                 "peak_rss_mb": 0.0})
+        s["runs"] += 1
+        if r["success"] is not None:
+            s["scored"] += 1
+            s["successes"] += r["success"]
+        s["total"] += r["total"]
+        s["peak_rss_mb"] = max(s["peak_rss_mb"], r["peak_rss_mb"])
+        for k, v in r["stages"].items():
+            s["stages"][k] = s["stages"].get(k, 0.0) + v
+    for s in out.values():
+        n = s["runs"]
+        s["success_rate"] = s["successes"] / s["scored"] if s["scored"] else None
+        s["total"] /= n
+        s["stages"] = {k: v / n for k, v in s["stages"].items()}
+    return list(out.values())
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--samples", type=int, nargs="+", default=[250, 400])
+    ap.add_argument("--trials", type=int, default=2)
+    ap.add_argument("--solvers", nargs="+", choices=SOLVERS, default=list(SOLVERS))
+    ap.add_argument("--lowbyte", action="store_true",
+                    help="keystream byte = untempered low byte (the trained models' assumption) "
+                         "instead of getrandbits(8)")
+    ap.add_argument("--cache", action="store_true", help="allow predictor cache hits (times only solving)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", default=os.path.join(tempfile.gettempdir(), "bench_solvers.json"))
+    args = ap.parse_args()
+    tempered = not args.lowbyte
+
+    ctx = mp.get_context("spawn")           # fresh interpreter per run: clean peak RSS
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.samples:
+            for t in range(args.trials):
+                path = os.path.join(tmp, f"samples_{n}_{t}.txt")
+                flag = make_samples(path, n, args.seed * 1000003 + 7919 * n + t, tempered)
+                for solver in args.solvers:
+                    # each run converts its own copy, so "load" always includes parsing
+                    run_path = f"{path}.{solver}"
+                    with open(path) as src, open(run_path, "w") as dst:
+                        dst.write(src.read())
+                    with ctx.Pool(1) as pool:
+                        r = pool.apply(run_one, (solver, run_path, flag, tempered, args.cache))
+                    r.update(solver=solver, samples=n, trial=t)
+                    results.append(r)
+                    st = " ".join(f"{k} {v:.2f}s" for k, v in r["stages"].items())
+                    print(f"{solver:12s} n={n:<5d} #{t} {_status(r['success'])} "
+                          f"{st}  peak {r['peak_rss_mb']:.0f} MiB" + (f"  [{r['error']}]" if r["error"] else ""))
+
+    summary = summarize(results)
+    print()
+    print(f"{'solver':12s} {'samples':>7s} {'success':>8s} {'total s':>8s} {'peak MiB':>9s}")
+    for s in summary:
+        rate = "n/a" if s["success_rate"] is None else f"{s['success_rate']:.2f}"
+        print(f"{s['solver']:12s} {s['samples']:7d} {rate:>8s} {s['total']:8.2f} {s['peak_rss_mb']:9.0f}")
+    meta = {"time": int(time.time()), "python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(), "cpus": os.cpu_count(), "keystream": "getrandbits(8)"
+            if tempered else "untempered low byte", "trials": args.trials, "cache": args.cache}
+    with open(args.out, "w") as f:
+        json.dump({"meta": meta, "summary": summary, "runs": results}, f, indent=1)
+    print(f"[*] wrote {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,230 @@
 # brute_time_seed.py
-import time, binascii, random, argparse
+import os, time, binascii, random, argparse
+import numpy as np
+from multiprocessing import Pool, Event
+from mt_np import seed_states, first_outputs
 
-def try_search(ciphertext_hex, leak32, pid, window_before, window_after, ts_center=None):
-    ct = binascii.unhexlify(ciphertext_hex)
+PREFIX = b"CTF{"
+SHARD = 1 << 17        # timestamps per pool task
+BATCH = 1 << 15        # seeds per vectorized init; the stop flag is polled per batch
+
+def check_candidate(ct, leak32, ks_prefix, rng):
+    """Full check once the keystream prefix matched; rng sits right after the prefix bytes."""
     flag_len = len(ct)
+    ks = bytearray(ks_prefix)
+    while len(ks) < flag_len:
+        ks.append(rng.getrandbits(8))
+    plain = bytes(a ^ b for a, b in zip(ct, ks))
+    if plain.startswith(PREFIX) and plain.endswith(b"}"):
+        inner = plain[4:-1]
+        if len(inner) == 64 and all(chr(c).lower() in "0123456789abcdef" for c in inner):
+            # verify leak32
+            got = [rng.getrandbits(32) for _ in range(3)]
+            # still return candidate if format matches (leak mismatch maybe due to bit-buffering)
+            return plain.decode(), got == leak32
+    return None
+
+def scan(ct, leak32, pid, lo, hi, stop=None, batch=BATCH):
+    """
+    Timestamps in [lo, hi). Seeds are initialised BATCH at a time with the
+    vectorized init_by_array from mt_np; only the first four outputs are
+    computed and a seed survives only if their top bytes give CTF{. Survivors
+    are replayed with random.Random for the full check.
+    """
+    want = bytes(c ^ p for c, p in zip(ct, PREFIX))
+    want_arr = np.frombuffer(want, dtype=np.uint8)
+    for a in range(lo, hi, batch):
+        if stop is not None and stop.is_set():
+            return None
+        ts = np.arange(a, min(a + batch, hi), dtype=np.int64)
+        top = first_outputs(seed_states(ts ^ pid), len(PREFIX)) >> np.uint32(24)
+        for k in np.flatnonzero((top == want_arr).all(axis=1)):
+            t = int(ts[k])
+            hit = replay(ct, leak32, t ^ pid)
+            if hit:
+                return (t, t ^ pid) + hit
+    return None
+
+def replay(ct, leak32, seed, skip=0):
+    """check_candidate for one seed, replayed with random.Random (after skip words)."""
+    rng = random.Random(seed)
+    for _ in range(skip):
+        rng.getrandbits(32)
+    ks = bytes(rng.getrandbits(8) for _ in PREFIX)
+    if bytes(a ^ b for a, b in zip(ct, ks)) != PREFIX:
+        return None
+    return check_candidate(ct, leak32, ks, rng)
+
+def index_search(ciphertext_hex, leak32, pid, index_path):
+    """O(log n) lookup in a seed_index.py index instead of a scan; same result tuple."""
+    from seed_index import SeedIndex
+    ct = binascii.unhexlify(ciphertext_hex)
+    for seed in SeedIndex(index_path).candidates(ct, leak32):
+        hit = replay(ct, leak32, seed)
+        if hit:
+            return (seed ^ pid, seed) + hit
+    return None
+
+def shards(lo, hi, center, size=SHARD):
+    """Split [lo, hi) into shards, nearest to center first."""
+    out = [(s, min(s + size, hi)) for s in range(lo, hi, size)]
+    return sorted(out, key=lambda sh: abs((sh[0] + sh[1]) // 2 - center))
+
+_STOP = None
+
+def _init_worker(stop):
+    global _STOP
+    _STOP = stop
+
+def _scan_shard(task):
+    ct, leak32, pid, lo, hi = task
+    res = scan(ct, leak32, pid, lo, hi, _STOP)
+    if res:
+        _STOP.set()
+    return res
+
+def try_search(ciphertext_hex, leak32, pid, window_before, window_after, ts_center=None, workers=1):
+    ct = binascii.unhexlify(ciphertext_hex)
     if ts_center is None:
         ts_center = int(time.time())
-    found = []
-    for ts in range(ts_center - window_before, ts_center + window_after + 1):
-        seed = ts ^ pid
-        rng = random.Random(seed)
-        ks = bytearray()
-        while len(ks) < flag_len:
-            ks.extend(rng.getrandbits(8).to_bytes(1, "big"))
-        plain = bytes(a ^ b for a, b in zip(ct, ks[:flag_len]))
-        if plain.startswith(b"CTF{") and plain.endswith(b"}"):
-            inner = plain[4:-1]
-            if len(inner) == 64 and all(chr(c).lower() in "0123456789abcdef" for c in inner):
-                # verify leak32
-                got = [rng.getrandbits(32) for _ in range(3)]
-                if got == leak32:
-                    return (ts, seed, plain.decode(), True)
-                else:
-                    # still return candidate if format matches (leak mismatch maybe due to bit-buffering)
-                    return (ts, seed, plain.decode(), False)
+    lo, hi = ts_center - window_before, ts_center + window_after + 1
+    if workers <= 1:
+        return scan(ct, leak32, pid, lo, hi)
+
+    # shards go out nearest-first; the first hit sets the shared stop flag,
+    # every other worker bails out after its current batch and the pool is torn down
+    stop = Event()
+    tasks = [(ct, leak32, pid, a, b) for a, b in shards(lo, hi, ts_center)]
+    with Pool(workers, _init_worker, (stop,)) as pool:
+        for res in pool.imap_unordered(_scan_shard, tasks):
+            if res:
+                pool.terminate()
+                return res
     return None
 
+# -------------------- all samples in one pass --------------------
+
+def multi_scan(lo, hi, pids, keys, leak_pos, stop=None, batch=BATCH):
+    """
+    Every seed ts ^ pid (ts in [lo, hi), pid in pids) is generated once; its
+    words at leak_pos (leak32[0] of connection 0, 1, ... of that process) are
+    looked up among all samples' leak32[0] values at once (sorted keys,
+    searchsorted). Returns (seed, connection, word) for every match.
+    """
+    hits = []
+    last = leak_pos[-1] + 1
+    for a in range(lo, hi, batch):
+        if stop is not None and stop.is_set():
+            break
+        ts = np.arange(a, min(a + batch, hi), dtype=np.int64)
+        for pid in pids:
+            seeds = ts ^ pid
+            outs = first_outputs(seed_states(seeds), last)[:, leak_pos]
+            at = np.minimum(np.searchsorted(keys, outs), len(keys) - 1)
+            for r, c in zip(*np.nonzero(keys[at] == outs)):
+                hits.append((int(seeds[r]), int(c), int(outs[r, c])))
+    return hits
+
+_MULTI = None
+
+def _init_multi(args):
+    global _MULTI
+    _MULTI = args
+
+def _multi_shard(shard):
+    pids, keys, leak_pos = _MULTI
+    return multi_scan(shard[0], shard[1], pids, keys, leak_pos)
+
+def multi_search(samples, window_before, window_after, ts_center=None, conns=1, workers=1):
+    """
+    Seed search for a whole sample store in a single pass over the window.
+    conns: how many connections per seeded process to consider (<= 3, so the
+    leak words stay inside the first 227 outputs that need no full twist).
+    Returns {sample index: (ts, seed, flag, leak_ok, connection)}.
+    """
+    if ts_center is None:
+        ts_center = int(time.time())
+    lo, hi = ts_center - window_before, ts_center + window_after + 1
+    cts = samples.ciphertexts()
+    if not cts:
+        raise ValueError("no samples to search")
+    if conns < 1:
+        raise ValueError("conns must be at least 1")
+    K = len(cts[0]) + 3
+    leak_pos = [K*c + len(cts[0]) for c in range(conns)]
+    if leak_pos[-1] >= 227:
+        raise ValueError(f"conns={conns} puts the leak of the last connection at output "
+                         f"{leak_pos[-1]}, past the 227 untwisted words (use at most "
+                         f"{(227 - len(cts[0])) // K + 1})")
+    by_key = {}
+    for i, l in enumerate(samples.leak32[:, 0].tolist()):
+        by_key.setdefault(l, []).append(i)
+    keys = np.array(sorted(by_key), dtype=np.uint32)
+    pids = sorted(set(samples.pid.tolist()))
+
+    if workers <= 1:
+        hits = multi_scan(lo, hi, pids, keys, leak_pos)
+    else:
+        hits = []
+        with Pool(workers, _init_multi, ((pids, keys, leak_pos),)) as pool:
+            for h in pool.imap_unordered(_multi_shard, shards(lo, hi, ts_center)):
+                hits.extend(h)
+
+    found = {}
+    for seed, c, word in hits:
+        for i in by_key[word]:
+            if i in found:
+                continue
+            hit = replay(cts[i], samples.leak32[i].tolist(), seed, skip=K*c)
+            if hit:
+                found[i] = (seed ^ int(samples.pid[i]), seed) + hit + (c,)
+    return found
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--ct", required=True)   # ciphertext_hex
-    parser.add_argument("--leak", required=True) # comma separated 3 ints
-    parser.add_argument("--pid", type=int, required=True)
+    parser.add_argument("--ct")                  # ciphertext_hex
+    parser.add_argument("--leak")                # comma separated 3 ints
+    parser.add_argument("--pid", type=int)
+    parser.add_argument("--samples", default=None) # samples.txt/.store: every sample in one pass
+    parser.add_argument("--conns", type=int, default=1) # with --samples: connections per process (<= 3)
     parser.add_argument("--center", type=int, default=None)
     parser.add_argument("--before", type=int, default=3600) # seconds
     parser.add_argument("--after", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count()) # processes
+    parser.add_argument("--index", default=None) # seed_index.py build output: lookup, no scan
     args = parser.parse_args()
 
+    t0 = time.time()
+    if args.samples:
+        import sample_store
+        samples = sample_store.load(args.samples)
+        try:
+            found = multi_search(samples, args.before, args.after, args.center, args.conns, args.workers)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"[*] {len(samples)} samples x {args.before + args.after + 1} timestamps, "
+              f"{args.workers} workers, {time.time() - t0:.1f}s")
+        for i, (ts, seed, flag, leak_ok, c) in sorted(found.items()):
+            print(f"sample {i}: timestamp {ts} seed {seed} connection {c} leak_confirmed {leak_ok}")
+        flags = sorted({v[2] for v in found.values()})
+        for flag in flags:
+            print("FOUND:", flag)
+        if not flags:
+            print("No candidate in window.")
+        raise SystemExit(0)
+    if args.ct is None or args.leak is None or args.pid is None:
+        parser.error("--ct, --leak and --pid are required without --samples")
+
     leak32 = [int(x) for x in args.leak.split(",")]
-    res = try_search(args.ct, leak32, args.pid, args.before, args.after, args.center)
+    if args.index:
+        try:
+            res = index_search(args.ct, leak32, args.pid, args.index)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"[*] index lookup in {time.time() - t0:.3f}s")
+    else:
+        res = try_search(args.ct, leak32, args.pid, args.before, args.after, args.center, args.workers)
+        print(f"[*] {args.before + args.after + 1} timestamps, {args.workers} workers, {time.time() - t0:.1f}s")
     if res:
         ts, seed, flag, leak_ok = res
         print("FOUND:", flag)
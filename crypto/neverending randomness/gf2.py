@@ -0,0 +1,369 @@
+# gf2.py
+# GF(2) linear algebra shared by the neverending solvers.
+# Rows are Python ints with ncols bits (bit c = column c), same layout as gauss_gf2.
+#
+# Two backends:
+#  - pure Python ints (gauss_gf2_py, GF2Factor): the original code path
+#  - packed uint64 NumPy matrices with M4RI (Method of Four Russians) tables:
+#    gauss_gf2, M4RIFactor, rank_gf2, nullspace_gf2
+# Packed layout: bit c of a row lives in word c >> 6, bit c & 63 (little-endian),
+# so a Python int row and its packed words are the same bytes.
+
+import numpy as np
+
+M4RI_K = 8          # table width: 2^8 row combinations per strip
+ROW_BLOCK = 4096    # rows updated per table lookup (bounds temporary memory)
+
+# -------------------- Python-int backend --------------------
+
+def gauss_gf2_py(A_rows, b_bits, ncols):
+    """Baseline gauss_gf2 from solve_final.py, unchanged (the reference for bench_gf2.py)."""
+    rows = A_rows[:]
+    b = b_bits[:]
+    m = len(rows)
+    row = 0
+    pivots = []
+    for col in range(ncols):
+        mask = 1 << col
+        piv = None
+        for r in range(row, m):
+            if rows[r] & mask:
+                piv = r; break
+        if piv is None:
+            continue
+        rows[row], rows[piv] = rows[piv], rows[row]
+        b[row], b[piv] = b[piv], b[row]
+        pivots.append(col)
+        for r in range(m):
+            if r!=row and (rows[r] & mask):
+                rows[r] ^= rows[row]
+                b[r]    ^= b[row]
+        row += 1
+        if row==m: break
+    # Back-sub
+    w = 0
+    for i in reversed(range(row)):
+        col = pivots[i]
+        rem = rows[i] & ~(1<<col)
+        s = 0
+        x = rem
+        while x:
+            c = (x & -x).bit_length()-1
+            s ^= (w >> c) & 1
+            x &= x-1
+        val = b[i] ^ s
+        if val: w |= (1<<col)
+    return w
+
+class GF2Factor:
+    """
+    Gauss-Jordan factorization of A that is reused for any number of
+    right-hand sides. Each reduced row keeps a mask of the original rows that
+    were XORed into it, so solving A w = b is a parity per pivot instead of a
+    fresh elimination.
+    """
+    def __init__(self, A_rows, ncols):
+        rows = A_rows[:]
+        m = len(rows)
+        combo = [1 << r for r in range(m)]
+        pivots = []
+        row = 0
+        for col in range(ncols):
+            mask = 1 << col
+            piv = None
+            for r in range(row, m):
+                if rows[r] & mask:
+                    piv = r; break
+            if piv is None:
+                continue
+            rows[row], rows[piv] = rows[piv], rows[row]
+            combo[row], combo[piv] = combo[piv], combo[row]
+            pivots.append(col)
+            prow, pcombo = rows[row], combo[row]
+            for r in range(m):
+                if r != row and (rows[r] & mask):
+                    rows[r] ^= prow
+                    combo[r] ^= pcombo
+            row += 1
+            if row == m: break
+        self.nrows = m
+        self.ncols = ncols
+        self.rank = row
+        self.pivots = pivots
+        self.combo = combo[:row]
+
+    def solve(self, b_bits):
+        """One solution of A w = b (free variables = 0), as an int."""
+        b = 0
+        for r, bit in enumerate(b_bits):
+            if bit & 1:
+                b |= 1 << r
+        w = 0
+        for col, c in zip(self.pivots, self.combo):
+            if bin(c & b).count("1") & 1:
+                w |= 1 << col
+        return w
+
+    def solve_many(self, B_rows, nrhs):
+        """
+        Solve A w_k = b_k for k in 0..nrhs-1 in one pass.
+        B_rows[r] packs row r of every right-hand side: bit k = b_k[r].
+        Returns the list of nrhs solutions as ints.
+        """
+        m = self.nrows
+        # Four-Russians tables: XOR of every subset of 8 consecutive RHS rows
+        tables = []
+        for base in range(0, m, 8):
+            chunk = B_rows[base:base+8]
+            t = [0] * (1 << len(chunk))
+            for i in range(1, len(t)):
+                low = i & -i
+                t[i] = t[i ^ low] ^ chunk[low.bit_length()-1]
+            tables.append(t)
+
+        nbytes = (m + 7) // 8
+        out = [bytearray((self.ncols + 7) // 8) for _ in range(nrhs)]
+        for col, c in zip(self.pivots, self.combo):
+            v = 0
+            for t, byte in zip(tables, c.to_bytes(nbytes, "little")):
+                if byte:
+                    v ^= t[byte]
+            # scatter: bit k of v is coordinate `col` of solution k
+            pos, bit = col >> 3, 1 << (col & 7)
+            while v:
+                low = v & -v
+                out[low.bit_length()-1][pos] |= bit
+                v ^= low
+        return [int.from_bytes(w, "little") for w in out]
+
+# -------------------- packed uint64 backend --------------------
+
+def nwords(ncols):
+    return (ncols + 63) >> 6
+
+def pack_rows(rows, ncols):
+    """List of Python-int rows -> (m, nwords) uint64 matrix."""
+    nb = nwords(ncols) * 8
+    buf = bytearray(b"".join(int(r).to_bytes(nb, "little") for r in rows))
+    return np.frombuffer(buf, dtype="<u8").reshape(len(rows), nb // 8)
+
+def pack_le(a):
+    """(m, k) array of unsigned words, word j at bits j*wordsize.. -> packed (m, nwords) rows."""
+    a = np.ascontiguousarray(a, dtype=np.asarray(a).dtype.newbyteorder("<"))
+    b = a.view(np.uint8).reshape(a.shape[0], -1)
+    pad = -b.shape[1] % 8
+    if pad:
+        b = np.hstack([b, np.zeros((b.shape[0], pad), dtype=np.uint8)])
+    return np.ascontiguousarray(b).view("<u8")
+
+def pack_bits(bits):
+    """(m, ncols) 0/1 matrix -> (m, nwords) uint64 matrix."""
+    bits = np.asarray(bits, dtype=np.uint8)
+    m, n = bits.shape
+    pad = nwords(n) * 64 - n
+    if pad:
+        bits = np.hstack([bits, np.zeros((m, pad), dtype=np.uint8)])
+    packed = np.packbits(bits, axis=1, bitorder="little")
+    return np.ascontiguousarray(packed).view("<u8")
+
+def unpack_bits(A, ncols):
+    """(m, nwords) uint64 matrix -> (m, ncols) 0/1 uint8 matrix."""
+    A = np.ascontiguousarray(A, dtype="<u8")
+    return np.unpackbits(A.view(np.uint8), axis=1, bitorder="little")[:, :ncols]
+
+def unpack_row(words):
+    return int.from_bytes(np.ascontiguousarray(words, dtype="<u8").tobytes(), "little")
+
+def unpack_rows(A):
+    return [unpack_row(w) for w in A]
+
+def as_packed(A, ncols):
+    if isinstance(A, np.ndarray):
+        return np.array(A, dtype="<u8", copy=True)
+    return pack_rows(A, ncols)
+
+def identity(m):
+    I = np.zeros((m, nwords(m)), dtype="<u8")
+    r = np.arange(m)
+    I[r, r >> 6] = np.left_shift(np.uint64(1), (r & 63).astype(np.uint64))
+    return I
+
+def _combo_table(P):
+    """All 2^k XOR combinations of the k rows of P (index bit i = row i)."""
+    k, w = P.shape
+    T = np.zeros((1 << k, w), dtype=P.dtype)
+    for i in range(k):
+        T[1 << i:2 << i] = T[:1 << i] ^ P[i]
+    return T
+
+def _apply_table(A, idx, T, w0):
+    """A[r, w0:] ^= T[idx[r]] for every row with idx != 0, a block at a time."""
+    rows = np.flatnonzero(idx)
+    if 2*rows.size < A.shape[0]:
+        # sparse update: gather/scatter only the rows that change
+        for s in range(0, rows.size, ROW_BLOCK):
+            r = rows[s:s+ROW_BLOCK]
+            A[r, w0:] ^= T[idx[r]]
+    elif rows.size:
+        # dense update: contiguous slices, idx 0 rows XOR the zero row
+        for s in range(0, A.shape[0], ROW_BLOCK):
+            A[s:s+ROW_BLOCK, w0:] ^= T[idx[s:s+ROW_BLOCK]]
+
+def strip_index(A, w0, pcols):
+    """Per row, the bits at the strip's pivot columns (bit i = pcols[i])."""
+    idx = np.zeros(A.shape[0], dtype=np.intp)
+    for i, pc in enumerate(pcols):
+        idx |= ((A[:, w0] >> np.uint64(pc & 63)) & np.uint64(1)).astype(np.intp) << i
+    return idx
+
+def clear_strip(A, w0, row, pcols):
+    """Clear the strip's pivot columns from every row but the pivot rows A[row:row+kp]."""
+    idx = strip_index(A, w0, pcols)
+    idx[row:row+len(pcols)] = 0
+    _apply_table(A, idx, _combo_table(A[row:row+len(pcols), w0:].copy()), w0)
+
+def rref_m4ri(A, ncols, k=M4RI_K, clear=clear_strip):
+    """
+    In-place reduced row echelon form of packed A over its first ncols columns
+    (extra columns, e.g. right-hand sides, are carried along). Columns are taken
+    in aligned strips of k: pivots for the strip are found on the k-bit strip
+    values only, then every other row is cleared with one lookup into the table
+    of 2^k pivot-row combinations (clear(A, w0, row, pcols), swappable for a
+    parallel version). Returns the pivot columns; pivot row i = A[i].
+    """
+    m = A.shape[0]
+    assert 64 % k == 0
+    pivots = []
+    row = 0
+    col = 0
+    while col < ncols and row < m:
+        kk = min(k, ncols - col)
+        w0, sh = col >> 6, np.uint64(col & 63)
+        v = ((A[row:, w0] >> sh) & np.uint64((1 << kk) - 1)).astype(np.uint8)
+
+        # pick pivot rows for this strip (on the small strip values only)
+        pcols = []
+        for b in range(kk):
+            p0 = len(pcols)
+            cand = np.flatnonzero((v[p0:] >> b) & 1)
+            if cand.size == 0:
+                continue
+            p = p0 + int(cand[0])
+            if p != p0:
+                v[[p0, p]] = v[[p, p0]]
+                A[[row+p0, row+p]] = A[[row+p, row+p0]]
+            hit = ((v >> b) & 1).astype(bool)
+            hit[p0] = False
+            v[hit] ^= v[p0]
+            pcols.append(col + b)
+        col += kk
+        if not pcols:
+            continue
+
+        # Gauss-Jordan among the pivot rows so each has exactly one pivot bit
+        kp = len(pcols)
+        P = A[row:row+kp, w0:]
+        for i, pc in enumerate(pcols):
+            sh_i = np.uint64(pc & 63)
+            for j in range(kp):
+                if j != i and (P[j, 0] >> sh_i) & np.uint64(1):
+                    P[j] ^= P[i]
+
+        clear(A, w0, row, pcols)
+        pivots.extend(pcols)
+        row += kp
+    return pivots
+
+def matmul_m4ri(A, B, n, k=M4RI_K):
+    """Packed GF(2) product A (m x n bits) @ B (n x p bits) -> (m x p bits)."""
+    m = A.shape[0]
+    C = np.zeros((m, B.shape[1]), dtype="<u8")
+    for c0 in range(0, n, k):
+        kk = min(k, n - c0)
+        idx = ((A[:, c0 >> 6] >> np.uint64(c0 & 63)) & np.uint64((1 << kk) - 1)).astype(np.intp)
+        _apply_table(C, idx, _combo_table(B[c0:c0+kk]), 0)
+    return C
+
+def transpose_bits(A, nrows, ncols, block=2048):
+    """Packed (nrows x ncols) -> packed (ncols x nrows), a band of rows at a time."""
+    out = np.zeros((ncols, nwords(nrows)), dtype="<u8")
+    for r0 in range(0, nrows, block):
+        bits = unpack_bits(A[r0:min(r0+block, nrows)], ncols)
+        w0 = r0 >> 6
+        out[:, w0:w0+nwords(bits.shape[0])] = pack_bits(bits.T)
+    return out
+
+def _nullspace(R, pivots, ncols):
+    # one basis vector per free column f: bit f plus the pivots whose row has f
+    piv = np.array(pivots, dtype=np.intp)
+    free = np.setdiff1d(np.arange(ncols), piv)
+    Nb = np.zeros((free.size, ncols), dtype=np.uint8)
+    Nb[np.arange(free.size), free] = 1
+    if piv.size and free.size:
+        Nb[:, piv] = unpack_bits(R, ncols)[:, free].T
+    return pack_bits(Nb)
+
+class M4RIFactor:
+    """
+    Packed counterpart of GF2Factor. Factors [A | I] once with rref_m4ri; the
+    identity block records the row transform, so any batch of right-hand sides
+    is a single packed product transform @ B.
+    """
+    def __init__(self, A, ncols, aug=None, clear=clear_strip):
+        """aug: optional preallocated (m, nwords(ncols) + nwords(m)) work buffer."""
+        A = as_packed(A, ncols)
+        m = A.shape[0]
+        wa = nwords(ncols)
+        if aug is None:
+            aug = np.empty((m, wa + nwords(m)), dtype="<u8")
+        aug[:, :wa] = A[:, :wa]
+        aug[:, wa:] = identity(m)
+        pivots = rref_m4ri(aug, ncols, clear=clear)
+        r = len(pivots)
+        self.nrows = m
+        self.ncols = ncols
+        self.rank = r
+        self.pivots = pivots
+        self.reduced = np.array(aug[:r, :wa])
+        self.transform = np.array(aug[:r, wa:])
+
+    def solve_packed(self, B):
+        """B: packed (m x nrhs) RHS matrix -> packed (ncols x nrhs) solutions."""
+        V = matmul_m4ri(self.transform, B, self.nrows)
+        X = np.zeros((self.ncols, B.shape[1]), dtype="<u8")
+        X[self.pivots] = V
+        return X
+
+    def solve_many(self, B_rows, nrhs):
+        """Same contract as GF2Factor.solve_many: returns nrhs solution ints."""
+        X = self.solve_packed(as_packed(B_rows, nrhs))
+        return unpack_rows(transpose_bits(X, self.ncols, nrhs))
+
+    def solve(self, b_bits):
+        return self.solve_many([int(b) & 1 for b in b_bits], 1)[0]
+
+    def nullspace(self):
+        """Packed basis (nfree x ncols bits) of {w : A w = 0}."""
+        return _nullspace(self.reduced, self.pivots, self.ncols)
+
+def gauss_gf2(A_rows, b_bits, ncols):
+    """Drop-in for the Python-int gauss_gf2: solve A w = b, free vars = 0."""
+    A = as_packed(A_rows, ncols)
+    wa = A.shape[1]
+    b = np.asarray([int(x) & 1 for x in b_bits], dtype="<u8")
+    aug = np.hstack([A, b[:, None]])
+    pivots = rref_m4ri(aug, ncols)
+    sol = np.zeros(wa, dtype="<u8")
+    for i, col in enumerate(pivots):
+        if aug[i, wa]:
+            sol[col >> 6] |= np.uint64(1) << np.uint64(col & 63)
+    return unpack_row(sol)
+
+def rank_gf2(A_rows, ncols):
+    return len(rref_m4ri(as_packed(A_rows, ncols), ncols))
+
+def nullspace_gf2(A_rows, ncols):
+    """Basis of the right nullspace of A as a list of Python ints."""
+    A = as_packed(A_rows, ncols)
+    pivots = rref_m4ri(A, ncols)
+    return unpack_rows(_nullspace(A[:len(pivots)], pivots, ncols))
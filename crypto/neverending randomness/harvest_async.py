@@ -0,0 +1,216 @@
+# harvest_async.py
+# Concurrent sample harvester (asyncio).
+# - up to --concurrency connections in flight, new connections paced by a
+#   token bucket (--rate per second, --burst)
+# - samples.txt is append-only: existing lines are read back on start, their
+#   ciphertexts are used for dedup, and the run continues until --count
+#   unique samples are on disk (so an interrupted run just resumes)
+# - --stop-file: quit as soon as that file appears (solve_online.py creates it);
+#   a stop file older than this run is stale and ignored
+# - per-connection latency (connect / first byte / total) goes to stderr
+# - lines are written in connection order, not completion order: each
+#   connection is numbered when it is established (the server draws its sample
+#   on accept) and replies wait in a reorder buffer until every earlier
+#   connection has answered or failed, so the stream order the solvers rely on
+#   survives a slow or jittery server; on Ctrl-C the buffered lines are still
+#   written, in order, skipping the connections that never answered
+# - --out is opened (append) on the first new sample, never before
+#
+# Try it locally: python3 local_server.py --port 9195 &
+#                 python3 harvest_async.py --host 127.0.0.1 --count 500
+
+import asyncio, argparse, ast, os, re, sys, time
+
+HOST = "ctf.ac.upt.ro"
+PORT = 9195
+OUT = "samples.txt"
+
+class TokenBucket:
+    """rate tokens/s, at most burst stored; take() waits for one."""
+    def __init__(self, rate, burst):
+        self.rate, self.burst = rate, burst
+        self.tokens = burst
+        self.last = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def take(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def parse_sample(line):
+    m = re.search(r"(\{.*\})", line)
+    if not m:
+        return None
+    try:
+        d = ast.literal_eval(m.group(1))
+    except (ValueError, SyntaxError):
+        return None
+    if not isinstance(d, dict) or "ciphertext_hex" not in d:
+        return None
+    return d
+
+def load_seen(path):
+    """Ciphertexts already in the output file (missing file = fresh start)."""
+    seen = set()
+    try:
+        with open(path) as f:
+            for ln in f:
+                d = parse_sample(ln)
+                if d:
+                    seen.add(d["ciphertext_hex"])
+    except FileNotFoundError:
+        pass
+    return seen
+
+async def fetch(host, port, timeout, on_connect=None):
+    """One connection -> (line, (connect, first byte, total) seconds); on_connect() once established."""
+    t0 = time.perf_counter()
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    t1 = time.perf_counter()
+    if on_connect:
+        on_connect()
+    try:
+        line = await asyncio.wait_for(reader.readline(), timeout)
+        t2 = time.perf_counter()
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+    return line.decode(errors="replace").strip(), (t1 - t0, t2 - t1, t2 - t0)
+
+class Harvester:
+    def __init__(self, args):
+        self.args = args
+        self.started = time.time()
+        self.seen = load_seen(args.out)
+        self.start = len(self.seen)
+        self.dups = self.errors = 0
+        self.lat = []
+        self.conns = self.next = 0             # connection numbers issued / next one to write
+        self.pending = {}                      # connection number -> line (None = failed)
+        self.bucket = TokenBucket(args.rate, args.burst)
+        self.out = None
+
+    def done(self):
+        if self.args.stop_file and os.path.exists(self.args.stop_file) \
+                and os.path.getmtime(self.args.stop_file) >= self.started:
+            return True                        # solve_online.py has what it needs
+        return len(self.seen) >= self.args.count
+
+    def connected(self):
+        self.conns += 1
+        return self.conns - 1
+
+    def settle(self, seq, line):
+        """Hold line until every earlier connection is settled, then record in order."""
+        self.pending[seq] = line
+        while self.next in self.pending:
+            line = self.pending.pop(self.next)
+            self.next += 1
+            if line is not None:
+                self.record(line)
+
+    def drain(self):
+        """Write what is still buffered, in order; unsettled connections become gaps."""
+        for seq in sorted(self.pending):
+            line = self.pending.pop(seq)
+            if line is not None:
+                self.record(line)
+        self.next = self.conns
+
+    def record(self, line):
+        d = parse_sample(line)
+        if d is None:
+            self.errors += 1
+            print(f"bad line: {line[:80]!r}", file=sys.stderr)
+            return
+        if self.done():
+            return                         # a straggler after the target was reached
+        if d["ciphertext_hex"] in self.seen:
+            self.dups += 1
+            return
+        self.seen.add(d["ciphertext_hex"])
+        if self.out is None:
+            self.out = open(self.args.out, "a")
+        self.out.write(line + "\n")
+        self.out.flush()                   # every line on disk as soon as it arrives
+
+    async def worker(self, wid):
+        backoff = 1.0
+        while not self.done():
+            await self.bucket.take()
+            if self.done():
+                break
+            seq = []
+            try:
+                line, (tc, tf, tt) = await fetch(self.args.host, self.args.port, self.args.timeout,
+                                                 lambda: seq.append(self.connected()))
+            except (OSError, asyncio.TimeoutError) as e:
+                if seq:
+                    self.settle(seq[0], None)  # a gap the later lines must not wait on
+                self.errors += 1
+                print(f"[w{wid}] err {e!r}, retry in {backoff:.1f}s", file=sys.stderr)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+                continue
+            backoff = 1.0
+            self.lat.append(tt)
+            self.settle(seq[0], line)
+            if not self.args.quiet:
+                print(f"[w{wid}] {len(self.seen)}/{self.args.count} connect {tc*1e3:.1f}ms "
+                      f"first-byte {tf*1e3:.1f}ms total {tt*1e3:.1f}ms", file=sys.stderr)
+
+    async def run(self):
+        t0 = time.perf_counter()
+        try:
+            await asyncio.gather(*(self.worker(i) for i in range(self.args.concurrency)))
+        finally:
+            self.drain()
+            if self.out:
+                self.out.close()
+        self.report(time.perf_counter() - t0)
+
+    def report(self, elapsed):
+        got = len(self.seen) - self.start
+        print(f"[*] {got} new samples ({len(self.seen)} total) in {elapsed:.1f}s, "
+              f"{self.dups} duplicates, {self.errors} errors", file=sys.stderr)
+        if self.lat:
+            lat = sorted(self.lat)
+            q = lambda p: lat[min(len(lat) - 1, int(p * len(lat)))] * 1e3
+            print(f"[*] latency ms: min {lat[0]*1e3:.1f} p50 {q(.5):.1f} p95 {q(.95):.1f} "
+                  f"max {lat[-1]*1e3:.1f}", file=sys.stderr)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--out", default=OUT)
+    ap.add_argument("--count", type=int, default=300, help="unique samples wanted in --out")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--rate", type=float, default=5.0, help="new connections per second")
+    ap.add_argument("--burst", type=float, default=5.0)
+    ap.add_argument("--timeout", type=float, default=6.0)
+    ap.add_argument("--stop-file", default=None, help="stop as soon as this file exists")
+    ap.add_argument("--quiet", action="store_true", help="summary only, no per-connection lines")
+    args = ap.parse_args()
+
+    h = Harvester(args)
+    if h.done():
+        print(f"[*] {args.out} already has {h.start} samples (or the stop file exists)", file=sys.stderr)
+        return
+    try:
+        asyncio.run(h.run())
+    except KeyboardInterrupt:
+        print(f"\n[*] interrupted; {len(h.seen)} samples in {args.out}, rerun to resume", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# lfsr.py
+# Bit-packed LFSR tools over GF(2), on Python ints used as bitsets
+# (bit i of a sequence int = s_i, bit i of a polynomial int = coeff of x^i).
+# XOR/AND/shift/bit_count on big ints run at C speed, so Berlekamp-Massey is
+# O(n^2 / 64) word operations instead of O(n^2) interpreter steps.
+#
+# Jump-ahead: for connection polynomial C (s_n = sum_{i=1..L} c_i s_{n-i}) the
+# characteristic polynomial is P(x) = x^L C(1/x), and s_{k+N} is the parity of
+# (x^N mod P) against the window s_k..s_{k+L-1}; x^N mod P takes O(log N)
+# squarings, so N can be astronomically large.
+#
+#   python3 lfsr.py     # linear complexity of an MT19937 output bit lane + jump check
+
+import random, sys, time
+
+def bits_to_int(bits):
+    """List of 0/1 (index = bit position) -> int."""
+    return int("".join("1" if b & 1 else "0" for b in reversed(bits)) or "0", 2)
+
+def int_to_bits(x, n):
+    return [(x >> i) & 1 for i in range(n)]
+
+def berlekamp_massey(seq, n):
+    """
+    Shortest LFSR generating the first n bits of seq (int).
+    Returns (C, L): C the connection polynomial as an int (bit 0 = 1, deg C <= L).
+    """
+    # rev holds the sequence reversed, so the window s_n, s_{n-1}, ... that the
+    # discrepancy needs is just rev >> (n-1 - i) aligned with C's bits
+    rev = int(format(seq & ((1 << n) - 1), f"0{n}b")[::-1], 2) if n else 0
+    C = B = 1
+    L, m = 0, -1
+    for i in range(n):
+        if (C & (rev >> (n - 1 - i))).bit_count() & 1:
+            T = C
+            C ^= B << (i - m)
+            if 2*L <= i:
+                L, B, m = i + 1 - L, T, i
+    return C, L
+
+def char_poly(C, L):
+    """P(x) = x^L C(1/x): the coefficient list of C reversed over L+1 bits."""
+    return int(format(C, f"0{L+1}b")[::-1], 2)
+
+# -------------------- GF(2)[x] arithmetic --------------------
+
+_SPREAD = [int(format(b, "08b").replace("", "0")[:-1] or "0", 2).to_bytes(2, "little") for b in range(256)]
+
+def clmul(a, b):
+    """Carry-less product, 8-bit windows over the shorter operand."""
+    if a.bit_length() < b.bit_length():
+        a, b = b, a
+    T = [0] * 256
+    for i in range(1, 256):
+        T[i] = T[i & (i - 1)] ^ (a << ((i & -i).bit_length() - 1))
+    r = 0
+    for k, byte in enumerate(b.to_bytes((b.bit_length() + 7) // 8, "little")):
+        if byte:
+            r ^= T[byte] << (8*k)
+    return r
+
+def square(a):
+    """a(x)^2: spread every bit to the even positions (squaring is linear over GF(2))."""
+    raw = a.to_bytes((a.bit_length() + 7) // 8, "little")
+    return int.from_bytes(b"".join(_SPREAD[b] for b in raw), "little")
+
+class PolyMod:
+    """Reduction modulo a fixed P, clearing 8 high bits per step from a 256-entry table."""
+    def __init__(self, P):
+        assert P > 1
+        self.P = P
+        self.d = d = P.bit_length() - 1
+        self.R = [0] * 256
+        for q in range(256):
+            v = clmul(q, P)
+            self.R[(v >> d) & 0xFF] = v      # q -> top byte of q*P is a bijection
+
+    def reduce(self, x):
+        d, R = self.d, self.R
+        while x.bit_length() > d:
+            shift = max(0, x.bit_length() - d - 8)
+            x ^= R[(x >> (shift + d)) & 0xFF] << shift
+        return x
+
+    def mul(self, a, b):
+        return self.reduce(clmul(a, b))
+
+    def x_pow(self, N):
+        """x^N mod P by left-to-right square-and-multiply."""
+        r = 1
+        for bit in bin(N)[2:]:
+            r = self.reduce(square(r))
+            if bit == "1":
+                r = self.reduce(r << 1)
+        return r
+
+# -------------------- jump-ahead --------------------
+
+def jump(C, L, window, N):
+    """s_{k+N} from the window s_k..s_{k+L-1} (int, bit j = s_{k+j})."""
+    if L == 0:
+        return 0
+    a = PolyMod(char_poly(C, L)).x_pow(N)
+    return (a & window).bit_count() & 1
+
+def jump_window(C, L, window, N):
+    """The whole window advanced by N: s_{k+N}..s_{k+N+L-1} as an int."""
+    if L == 0:
+        return 0
+    pm = PolyMod(char_poly(C, L))
+    a = pm.x_pow(N)
+    out = 0
+    for j in range(L):
+        out |= ((a & window).bit_count() & 1) << j
+        a = pm.reduce(a << 1)
+    return out
+
+def extend(C, L, seq, n, steps):
+    """seq (n bits) extended by steps bits with the recurrence; returns the int."""
+    crev = char_poly(C, L) & ((1 << L) - 1)     # weights for s_{k}..s_{k+L-1}
+    for i in range(n, n + steps):
+        s = (crev & (seq >> (i - L))).bit_count() & 1 if i >= L else 0
+        seq |= s << i
+    return seq
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2*19937 + 100
+    rng = random.Random(1)
+    words = [rng.getrandbits(32) for _ in range(n)]
+    seq = sum(((w & 1) << i) for i, w in enumerate(words))   # bit 0 lane of the tempered outputs
+
+    t0 = time.perf_counter()
+    C, L = berlekamp_massey(seq, n)
+    print(f"[*] BM over {n} bits: L = {L} in {time.perf_counter() - t0:.2f}s")
+
+    N = n + 1000
+    for _ in range(N - n + 1):
+        far = rng.getrandbits(32)
+    t0 = time.perf_counter()
+    got = jump(C, L, seq, N)
+    print(f"[*] bit {N} by jump-ahead: {got} (generator: {far & 1}) in {time.perf_counter() - t0:.2f}s")
+    t0 = time.perf_counter()
+    jump(C, L, seq, 10**18)
+    print(f"[*] jump ahead 10^18 steps in {time.perf_counter() - t0:.2f}s")
@@ -0,0 +1,63 @@
+# local_server.py
+# Local stand-in for the challenge service on port 9195.
+# Each server "process" (pid) owns a random.Random(ts ^ pid); every connection
+# draws 69 keystream bytes with getrandbits(8), XORs them with the flag, then
+# leaks three getrandbits(32) and sends one line:
+#   {'ciphertext_hex': ..., 'leak32': [a, b, c], 'pid': pid}
+# With one pid (the default) consecutive samples come from one contiguous
+# stream, which is what the solvers model.
+
+import asyncio, argparse, random, secrets, sys, time
+
+def make_flag():
+    return ("CTF{" + secrets.token_hex(32) + "}").encode()
+
+class Challenge:
+    def __init__(self, flag, pids, ts=None):
+        ts = int(time.time()) if ts is None else ts
+        self.flag = flag
+        self.rngs = {pid: random.Random(ts ^ pid) for pid in pids}
+        self.seeds = {pid: ts ^ pid for pid in pids}
+
+    def sample(self, pid=None):
+        pid = random.choice(list(self.rngs)) if pid is None else pid
+        rng = self.rngs[pid]
+        ks = bytes(rng.getrandbits(8) for _ in range(len(self.flag)))
+        ct = bytes(a ^ b for a, b in zip(self.flag, ks))
+        leak = [rng.getrandbits(32) for _ in range(3)]
+        return {"ciphertext_hex": ct.hex(), "leak32": leak, "pid": pid}
+
+async def serve(chal, host, port, delay):
+    async def handle(reader, writer):
+        line = repr(chal.sample()) + "\n"      # draw before any await: order = accept order
+        if delay:
+            await asyncio.sleep(random.uniform(0, delay))
+        writer.write(line.encode())
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+    server = await asyncio.start_server(handle, host, port)
+    print(f"[*] serving on {host}:{port}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9195)
+    ap.add_argument("--flag", default=None)
+    ap.add_argument("--pids", type=int, nargs="+", default=[7])
+    ap.add_argument("--ts", type=int, default=None, help="seed timestamp (default: now)")
+    ap.add_argument("--delay", type=float, default=0.0, help="max random reply delay (s)")
+    args = ap.parse_args()
+    flag = args.flag.encode() if args.flag else make_flag()
+    chal = Challenge(flag, args.pids, args.ts)
+    print(f"[*] flag {flag.decode()} seeds {chal.seeds}", file=sys.stderr)
+    try:
+        asyncio.run(serve(chal, args.host, args.port, args.delay))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# mt_np.py
+# Vectorized MT19937 for bulk reference streams.
+# The twist runs on whole state arrays (any leading batch shape, last axis 624),
+# temper/untemper work elementwise on uint32 arrays, and output matches
+# CPython's random.Random bit for bit (getrandbits(32) == tempered word).
+#
+# seed_states() runs CPython's init_by_array for many integer seeds at once
+# (lockstep over the 624 state words, vectorized over seeds), and
+# first_outputs() gives their first few outputs without a full twist.
+#
+# Jump-ahead: every bit position of the untempered output sequence satisfies the
+# same linear recurrence, whose characteristic polynomial phi (degree 19937) is
+# the minimal polynomial of the twist. With g = x^J mod phi (O(log J) products
+# in lfsr.PolyMod), y_{k+J+i} is the XOR of y_{k+i+j} over the terms x^j of g,
+# so the 624 words J steps ahead come from ~20k consecutive words.
+
+import random
+import numpy as np
+import lfsr
+
+N, M = 624, 397
+MATRIX_A   = np.uint32(0x9908B0DF)
+UPPER_MASK = np.uint32(0x80000000)
+LOWER_MASK = np.uint32(0x7FFFFFFF)
+
+def temper(y):
+    y = np.asarray(y, dtype=np.uint32)
+    y = y ^ (y >> np.uint32(11))
+    y = y ^ ((y << np.uint32(7))  & np.uint32(0x9D2C5680))
+    y = y ^ ((y << np.uint32(15)) & np.uint32(0xEFC60000))
+    y = y ^ (y >> np.uint32(18))
+    return y
+
+def untemper(y):
+    y = np.asarray(y, dtype=np.uint32)
+    y = y ^ (y >> np.uint32(18))
+    y = y ^ ((y << np.uint32(15)) & np.uint32(0xEFC60000))
+    t = y
+    for _ in range(4):      # 7-bit shift: each round fixes 7 more bits
+        t = y ^ ((t << np.uint32(7)) & np.uint32(0x9D2C5680))
+    y = t
+    y = y ^ (y >> np.uint32(11))
+    y = y ^ (y >> np.uint32(22))
+    return y
+
+def init_genrand(s):
+    """init_genrand for a vector of 32-bit seeds -> (len(s), 624) states."""
+    s = np.asarray(s, dtype=np.uint32)
+    mt = np.empty((N,) + s.shape, dtype=np.uint32)
+    mt[0] = s
+    for i in range(1, N):
+        mt[i] = np.uint32(1812433253) * (mt[i-1] ^ (mt[i-1] >> np.uint32(30))) + np.uint32(i)
+    return np.moveaxis(mt, 0, -1)
+
+_BASE = None    # init_genrand(19650218), the same for every seed
+
+def init_by_array(keys):
+    """
+    CPython's init_by_array for a batch of equal-length keys: keys is
+    (n, klen) uint32 -> (n, 624) states. Work runs word-major on a (624, n)
+    array, in place, so every step is a handful of ufuncs on one contiguous row.
+    """
+    global _BASE
+    if _BASE is None:
+        _BASE = init_genrand([19650218])[0]
+    keys = np.ascontiguousarray(np.asarray(keys, dtype=np.uint32).T)
+    klen, n = keys.shape
+    mt = np.empty((N, n), dtype=np.uint32)
+    mt[0] = _BASE[0]
+    fresh = np.ones(N, dtype=bool)      # word still holds its (scalar) _BASE value
+    c1, c2, s30 = np.uint32(1664525), np.uint32(1566083941), np.uint32(30)
+    i, j = 1, 0
+    for _ in range(max(N, klen)):
+        row, prev = mt[i], mt[i-1]
+        if fresh[i]:
+            np.right_shift(prev, s30, out=row)
+            row ^= prev; row *= c1; row ^= _BASE[i]
+            fresh[i] = False
+        else:
+            tmp = prev >> s30
+            tmp ^= prev; tmp *= c1; row ^= tmp
+        row += keys[j]
+        if j:
+            row += np.uint32(j)
+        i += 1; j += 1
+        if i >= N:
+            mt[0] = mt[N-1]; i = 1
+        if j >= klen:
+            j = 0
+    tmp = np.empty(n, dtype=np.uint32)
+    for _ in range(N - 1):
+        row, prev = mt[i], mt[i-1]
+        np.right_shift(prev, s30, out=tmp)
+        tmp ^= prev; tmp *= c2; row ^= tmp
+        row -= np.uint32(i)
+        i += 1
+        if i >= N:
+            mt[0] = mt[N-1]; i = 1
+    mt[0] = 0x80000000
+    return mt.T
+
+def seed_key(seed):
+    """random.seed(int)'s key: 32-bit little-endian words of abs(seed), at least one."""
+    seed = abs(int(seed))
+    return [(seed >> (32*k)) & 0xFFFFFFFF for k in range(max(1, -(-seed.bit_length() // 32)))]
+
+def seed_states(seeds):
+    """
+    States (len(seeds), 624) exactly as random.Random(seed) leaves them for
+    integer seeds (index 624: the first draw twists). Seeds are batched by key
+    length, so a mix of 32-bit and larger ints is fine.
+    """
+    if isinstance(seeds, np.ndarray) and seeds.dtype.kind in "iu":
+        mag = np.abs(seeds.astype(np.int64))
+        if len(mag) and mag.max() <= 0xFFFFFFFF:
+            return init_by_array(mag[:, None])       # all single-word keys
+    seeds = [abs(int(x)) for x in seeds]
+    out = np.empty((len(seeds), N), dtype=np.uint32)
+    klen = np.array([max(1, -(-x.bit_length() // 32)) for x in seeds])
+    for L in np.unique(klen):
+        rows = np.flatnonzero(klen == L)
+        keys = np.array([seed_key(seeds[r]) for r in rows], dtype=np.uint32).reshape(len(rows), L)
+        out[rows] = init_by_array(keys)
+    return out
+
+def first_outputs(states, n):
+    """
+    First n tempered outputs (n <= 227) of freshly seeded states (..., 624),
+    i.e. n calls of getrandbits(32). Word i of the twist only needs
+    mt[i], mt[i+1] and mt[i+397], so no full twist is run.
+    """
+    assert n <= N - M
+    return temper(_mix(states[..., :n], states[..., 1:n+1], states[..., M:M+n]))
+
+def output_at(states, i):
+    """Tempered output number i (< 227) of freshly seeded states (..., 624)."""
+    assert i < N - M
+    return temper(_mix(states[..., i], states[..., i+1], states[..., M+i]))
+
+def _mix(cur, nxt, far):
+    y = (cur & UPPER_MASK) | (nxt & LOWER_MASK)
+    return far ^ (y >> np.uint32(1)) ^ ((y & np.uint32(1)) * MATRIX_A)
+
+def twist(mt):
+    """
+    In-place twist of state array(s) mt[..., 624] (uint32).
+    mt[i] depends on mt[i+397] (already twisted once i >= 227), so the update
+    runs in three dependency-free chunks plus the wrap-around word.
+    """
+    a, b = N - M, 2*(N - M)          # 227, 454
+    mt[..., :a]    = _mix(mt[..., :a],    mt[..., 1:a+1],  mt[..., M:])
+    mt[..., a:b]   = _mix(mt[..., a:b],   mt[..., a+1:b+1], mt[..., :a])
+    mt[..., b:N-1] = _mix(mt[..., b:N-1], mt[..., b+1:N],  mt[..., a:M-1])
+    mt[..., N-1]   = _mix(mt[..., N-1],   mt[..., 0],      mt[..., M-1])
+    return mt
+
+PHI_DEGREE = 19937
+_PHI = None
+
+def char_poly():
+    """phi(x) of the MT19937 recurrence (int, bit i = coeff of x^i), found once by BM."""
+    global _PHI
+    if _PHI is None:
+        n = 2*PHI_DEGREE + 64
+        lane = (MT19937.from_seed(5489).untempered(n) & np.uint32(1)).astype(np.uint8)
+        seq = int.from_bytes(np.packbits(lane, bitorder="little").tobytes(), "little")
+        C, L = lfsr.berlekamp_massey(seq, n)
+        assert L == PHI_DEGREE
+        _PHI = lfsr.char_poly(C, L)
+    return _PHI
+
+def jump_window(words, J):
+    """
+    words: the next 624 untempered outputs y_k..y_{k+623} of any state.
+    Returns y_{k+J}..y_{k+J+623} (uint32 array) without stepping through the gap.
+    """
+    words = np.asarray(words, dtype=np.uint32)
+    if J == 0:
+        return words.copy()
+    # The low 31 bits of the oldest word feed nothing, so phi only annihilates
+    # from one step on: work from y_{k+1} and jump J-1.
+    g = lfsr.PolyMod(char_poly()).x_pow(J - 1)
+    ys = MT19937(words, 0).untempered(1 + PHI_DEGREE + N)[1:]
+    terms = np.flatnonzero(np.unpackbits(
+        np.frombuffer(g.to_bytes((g.bit_length() + 7) // 8 or 1, "little"), dtype=np.uint8),
+        bitorder="little"))
+    win = np.lib.stride_tricks.sliding_window_view(ys, N)[terms]
+    return np.bitwise_xor.reduce(win, axis=0) if len(terms) else np.zeros(N, dtype=np.uint32)
+
+class MT19937:
+    """Bulk MT19937 stream; same state/index convention as MT.seed_by_state."""
+    def __init__(self, state_words, idx0=N):
+        self.mt = np.array(state_words, dtype=np.uint32)
+        assert self.mt.shape == (N,)
+        self.mti = idx0 if idx0 >= N else idx0 % N
+
+    @classmethod
+    def from_random(cls, rng):
+        """Continue exactly where a random.Random instance is."""
+        st = rng.getstate()[1]
+        return cls(st[:N], st[N])
+
+    @classmethod
+    def from_seed(cls, seed):
+        return cls.from_random(random.Random(seed))
+
+    def to_random(self):
+        rng = random.Random()
+        rng.setstate((3, tuple(int(x) for x in self.mt) + (self.mti,), None))
+        return rng
+
+    def untempered(self, n):
+        """Next n untempered words as a uint32 array."""
+        out = np.empty(n, dtype=np.uint32)
+        pos = 0
+        while pos < n:
+            if self.mti >= N:
+                twist(self.mt)
+                self.mti = 0
+            take = min(N - self.mti, n - pos)
+            out[pos:pos+take] = self.mt[self.mti:self.mti+take]
+            self.mti += take
+            pos += take
+        return out
+
+    def tempered(self, n):
+        """Next n outputs, identical to n calls of getrandbits(32)."""
+        return temper(self.untempered(n))
+
+    def jump(self, J):
+        """Skip the next J words in O(log J) (see jump_window)."""
+        ahead = jump_window(MT19937(self.mt, self.mti).untempered(N), J)
+        self.mt, self.mti = ahead, 0
+        return self
@@ -0,0 +1,136 @@
+# mt_symbolic.py
+# Symbolic MT19937 over GF(2).
+# The twist is linear, so every untempered output bit y_t[b] is a linear form in
+# the 19968 bits of a starting window y_0..y_623. Forms are packed uint64 rows
+# (gf2 layout, variable 32*w + b = bit b of y_w), and a symbolic state is a
+# (624, 32, NW) array: one form per bit of each of the 624 words.
+#
+# exact_byte_predictors() uses this to compute the window -> keystream-byte
+# predictors of solve_final*.py directly, with no reference stream and no
+# overdetermined S-sample solve.
+
+import numpy as np
+from gf2 import nwords, identity, matmul_m4ri, rref_m4ri, transpose_bits, unpack_bits, unpack_rows
+from mt_np import N, M, temper
+
+NBITS = 32*N            # 19968 state bits
+NW = nwords(NBITS)      # 312 words per form
+MATRIX_A = 0x9908B0DF
+_A_BITS = [b for b in range(32) if (MATRIX_A >> b) & 1]
+SQUARE_MIN = 64         # below this many twists, stepping beats dense squaring
+
+def initial_state():
+    """Symbolic state for y_0..y_623: bit b of word w is variable 32*w + b."""
+    return identity(NBITS).reshape(N, 32, NW)
+
+def _mix(cur, nxt, far):
+    # far ^ ((upper(cur) | lower(nxt)) >> 1) ^ (lsb(nxt) * MATRIX_A), bit by bit
+    out = far.copy()
+    out[..., :30, :] ^= nxt[..., 1:31, :]
+    out[..., 30, :] ^= cur[..., 31, :]
+    out[..., _A_BITS, :] ^= nxt[..., 0:1, :]
+    return out
+
+def twist(S):
+    """In-place symbolic twist of S[624, 32, NW]; same chunking as mt_np.twist."""
+    a, b = N - M, 2*(N - M)
+    S[:a]    = _mix(S[:a],    S[1:a+1],   S[M:])
+    S[a:b]   = _mix(S[a:b],   S[a+1:b+1], S[:a])
+    S[b:N-1] = _mix(S[b:N-1], S[b+1:N],   S[a:M-1])
+    S[N-1]   = _mix(S[N-1],   S[0],       S[M-1])
+    return S
+
+def transition_matrix():
+    """Packed NBITS x NBITS matrix T of one full twist: state_{k+1} = T state_k."""
+    return twist(initial_state()).reshape(NBITS, NW)
+
+def matpow(T, e):
+    """T^e by repeated squaring with packed M4RI products."""
+    R = None
+    while e:
+        if e & 1:
+            R = T.copy() if R is None else matmul_m4ri(R, T, NBITS)
+        e >>= 1
+        if e:
+            T = matmul_m4ri(T, T, NBITS)
+    return identity(NBITS) if R is None else R
+
+def state_after(ntwists):
+    """Symbolic state after ntwists twists of the starting window."""
+    if ntwists < SQUARE_MIN:
+        S = initial_state()
+        for _ in range(ntwists):
+            twist(S)
+        return S
+    return matpow(transition_matrix(), ntwists).reshape(N, 32, NW)
+
+def output_forms(positions):
+    """
+    Forms of the untempered outputs y_t for the given t >= 0, shape
+    (len(positions), 32, NW). Jumps straight to the first needed twist, then
+    steps: T has three nonzeros per row, so one symbolic twist is far cheaper
+    than a dense product.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    out = np.empty((len(positions), 32, NW), dtype="<u8")
+    order = np.argsort(positions, kind="stable")
+    k = int(positions[order[0]]) // N
+    S = state_after(k)
+    for i in order:
+        kt, w = divmod(int(positions[i]), N)
+        while k < kt:
+            twist(S)
+            k += 1
+        out[i] = S[w]
+    return out
+
+def word_map(forms, fn):
+    """Apply a GF(2)-linear 32-bit map (e.g. temper) to symbolic words (..., 32, NW)."""
+    out = np.zeros_like(forms)
+    for i in range(32):
+        img = int(fn(1 << i))
+        for b in range(32):
+            if (img >> b) & 1:
+                out[..., b, :] ^= forms[..., i, :]
+    return out
+
+def exact_byte_predictors(W=624, kstride=72, leak_offsets=(69, 70, 71), flag_len=69,
+                          tempered_top=False):
+    """
+    Predictors in train_byte_predictors' format: for each keystream offset of
+    block j, 8 ints over the 32*W bits of the last W untempered leak words
+    (leaks[3j-W:3j], oldest first), exactly as main() slices its window.
+    Target byte is the untempered low byte like the trained predictors, or
+    temper(y) >> 24 (what random.getrandbits(8) returns) with tempered_top.
+    Returns (predictors, W, missing): missing counts target bits that are not
+    a function of the window (W too small); their weights are left at 0.
+    """
+    per = len(leak_offsets)
+    j = -(-W // per)                        # first block with W leaks of history
+    leaks = range(per*j - W, per*j)
+    obs_pos = [kstride*(l // per) + leak_offsets[l % per] for l in leaks]
+    tgt_pos = [kstride*j + off for off in range(flag_len)]
+    forms = output_forms(obs_pos + tgt_pos)
+
+    nobs, ntgt = 32*W, 8*flag_len
+    O = forms[:W].reshape(nobs, NW)         # row 32*i + b: bit b of window word i
+    tg = word_map(forms[W:], temper)[:, 24:] if tempered_top else forms[W:, :8]
+    Tg = np.ascontiguousarray(tg).reshape(ntgt, NW)   # row 8*off + bit
+
+    # weights x with x . O = t  <=>  O^T x = t^T: one elimination for all targets
+    G = np.hstack([transpose_bits(O, nobs, NBITS), transpose_bits(Tg, ntgt, NBITS)])
+    pivots = rref_m4ri(G, nobs)
+    r, wo = len(pivots), nwords(nobs)
+    rhs = G[:, wo:]
+    missing = unpack_bits(rhs[r:], ntgt).any(axis=0)
+    X = np.zeros((nobs, rhs.shape[1]), dtype="<u8")
+    X[pivots] = rhs[:r]
+    X[:, :] &= ~_packed_mask(missing, rhs.shape[1])
+    sols = unpack_rows(transpose_bits(X, nobs, ntgt))
+    return [sols[8*off:8*off+8] for off in range(flag_len)], W, int(missing.sum())
+
+def _packed_mask(bits, width):
+    words = np.zeros(width, dtype="<u8")
+    for k in np.flatnonzero(bits):
+        words[k >> 6] |= np.uint64(1) << np.uint64(k & 63)
+    return words
@@ -0,0 +1,151 @@
+# parallel_train.py
+# Process-parallel version of the factor-once / solve-all training step.
+#
+# 1) Factor: the [features | I] work matrix lives in one SharedMemory block.
+#    The parent runs the cheap M4RI pivot search for each 8-column strip and
+#    writes the 256-entry combination table to shared memory; each worker then
+#    clears the strip from its own band of rows in place (zero-copy).
+# 2) Solve: one packed product transform @ labels covers all 69*8 label
+#    columns, as in M4RIFactor.solve_packed; the pool splits it by row bands of
+#    the transform, each worker writing its band of the shared output matrix.
+# Progress for both phases goes to stderr.
+
+import os, sys, time
+import numpy as np
+from multiprocessing import Pool, shared_memory
+from gf2 import M4RIFactor, _combo_table, strip_index, matmul_m4ri, nwords, \
+    pack_le, transpose_bits, unpack_rows
+
+class SharedArray:
+    """ndarray over a named SharedMemory block: created by the parent, attached by workers."""
+    def __init__(self, shape, dtype, name=None):
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # pool workers share the parent's resource tracker, so attaching only
+            # re-adds the same name; the parent's unlink() retires it once
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.arr = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+        self.spec = (self.shm.name, tuple(shape), dtype.str)
+
+    @classmethod
+    def attach(cls, spec):
+        name, shape, dtype = spec
+        return cls(shape, dtype, name)
+
+    def release(self, unlink=False):
+        del self.arr
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+# -------------------- worker side --------------------
+
+_W = {}       # key -> attached ndarray
+_SHM = []     # keeps the worker's mappings alive as long as the arrays
+
+def _init_worker(specs):
+    for key, spec in specs.items():
+        sa = SharedArray.attach(spec)
+        _SHM.append(sa)
+        _W[key] = sa.arr
+
+def _clear_band(task):
+    """Clear the current strip from rows [s, e) of the shared work matrix."""
+    s, e, w0, row, pcols = task
+    A, T = _W["A"], _W["T"]
+    idx = strip_index(A[s:e], w0, pcols)
+    lo, hi = max(s, row), min(e, row + len(pcols))
+    if lo < hi:
+        idx[lo-s:hi-s] = 0          # pivot rows keep themselves
+    rows = np.flatnonzero(idx)
+    if rows.size:
+        A[s + rows, w0:] ^= T[idx[rows], :A.shape[1] - w0]
+
+def _solve_band(task):
+    """Rows [s, e) of V = transform @ labels, every label column at once."""
+    s, e = task
+    U, B, V = _W["U"], _W["B"], _W["V"]
+    V[s:e] = matmul_m4ri(U[s:e], B, B.shape[0])
+    return e - s
+
+# -------------------- parent side --------------------
+
+class _BandClear:
+    """clear() hook for rref_m4ri that farms the table update out to the pool."""
+    def __init__(self, pool, T, m, nbands, ncols):
+        self.pool, self.T, self.ncols = pool, T, ncols
+        self.bands = _bands(m, nbands)
+        self.t0 = self.last = time.perf_counter()
+
+    def __call__(self, A, w0, row, pcols):
+        P = A[row:row+len(pcols), w0:]
+        self.T[:1 << len(pcols), :P.shape[1]] = _combo_table(P.copy())
+        self.pool.map(_clear_band, [(s, e, w0, row, pcols) for s, e in self.bands])
+        if time.perf_counter() - self.last > 0.5:
+            _progress(pcols[-1] + 1, self.ncols, self.t0, "columns eliminated")
+            self.last = time.perf_counter()
+
+def _bands(m, nbands):
+    cuts = np.linspace(0, m, nbands + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+
+def _progress(done, total, t0, what):
+    rate = done / max(time.perf_counter() - t0, 1e-9)
+    sys.stderr.write(f"\r[*] {what}: {done}/{total} ({rate:.1f}/s)")
+    if done == total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+def factor_and_solve(feat_rows, nfeat, labels, workers=None):
+    """
+    Same result as M4RIFactor(feat_rows, nfeat).solve_many(...) on the packed
+    labels, computed with a process pool.
+    feat_rows: packed (S, nwords(nfeat)) features; labels: (S, FLAG_LEN) target bytes.
+    Returns the 8*FLAG_LEN solution ints (bit 8*off+bit order).
+    """
+    workers = workers or os.cpu_count()
+    S, nout = labels.shape
+    wa = nwords(nfeat)
+
+    # 1) factor [features | I] in shared memory
+    t0 = time.perf_counter()
+    A = SharedArray((S, wa + nwords(S)), "<u8")
+    T = SharedArray((256, A.arr.shape[1]), "<u8")
+    try:
+        with Pool(workers, _init_worker, ({"A": A.spec, "T": T.spec},)) as pool:
+            clear = _BandClear(pool, T.arr, S, workers, nfeat)
+            fac = M4RIFactor(feat_rows, nfeat, aug=A.arr, clear=clear)
+            _progress(nfeat, nfeat, clear.t0, "columns eliminated")
+    finally:
+        A.release(unlink=True)
+        T.release(unlink=True)
+    sys.stderr.write(f"[*] factored {S}x{nfeat} (rank {fac.rank}) on {workers} processes "
+                     f"in {time.perf_counter() - t0:.1f}s\n")
+
+    # 2) one product V = transform @ labels, split into row bands of the transform
+    packed = pack_le(labels)           # row si: bit 8*off+bit
+    U = SharedArray(fac.transform.shape, "<u8")
+    B = SharedArray(packed.shape, "<u8")
+    V = SharedArray((fac.rank, packed.shape[1]), "<u8")
+    U.arr[:] = fac.transform
+    B.arr[:] = packed
+    try:
+        specs = {"U": U.spec, "B": B.spec, "V": V.spec}
+        bands = _bands(fac.rank, 4 * workers)
+        with Pool(workers, _init_worker, (specs,)) as pool:
+            t0 = last = time.perf_counter()
+            done = 0
+            for rows in pool.imap_unordered(_solve_band, bands):
+                done += rows
+                if done == fac.rank or time.perf_counter() - last > 0.5:
+                    _progress(done, fac.rank, t0, "transform rows applied")
+                    last = time.perf_counter()
+        X = np.zeros((nfeat, packed.shape[1]), dtype="<u8")
+        X[fac.pivots] = V.arr
+    finally:
+        for sa in (U, B, V):
+            sa.release(unlink=True)
+    return unpack_rows(transpose_bits(X, nfeat, 8*nout))
@@ -0,0 +1,69 @@
+# predictor_cache.py
+# On-disk cache for train_byte_predictors.
+# The predictors only depend on the training parameters and the synthetic
+# reference seed (never on samples.txt), so each parameter set is trained once,
+# stored as a packed (FLAG_LEN, 8, nwords) uint64 .npy file and memory-mapped
+# on later runs.
+#
+# Exact predictors from mt_symbolic are cached the same way.
+#
+# Cache dir: $NEVERENDING_CACHE, default .predictor_cache/ next to this file.
+
+import hashlib, json, os
+import numpy as np
+from gf2 import pack_rows, unpack_rows
+from mt_symbolic import exact_byte_predictors
+
+FORMAT = 1   # bump when the trainer's output changes for the same parameters
+CACHE_DIR = os.environ.get("NEVERENDING_CACHE") or \
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".predictor_cache")
+
+def cache_key(**params):
+    """Short content hash of the parameters that fully determine the predictors."""
+    params = dict(params, format=FORMAT)
+    blob = json.dumps(params, sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:24], params
+
+def cache_path(key):
+    return os.path.join(CACHE_DIR, key + ".npy")
+
+def load(key):
+    """Memory-mapped (FLAG_LEN, 8, nwords) weights, or None on a miss."""
+    path = cache_path(key)
+    if not os.path.exists(path):
+        return None
+    return np.load(path, mmap_mode="r")
+
+def save(key, params, predictors, W):
+    arr = np.stack([pack_rows(weights, 32*W) for weights in predictors])
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = cache_path(key)
+    # write-then-rename so a crashed run never leaves a truncated entry
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp, path)
+    with open(os.path.join(CACHE_DIR, key + ".json"), "w") as f:
+        json.dump(params, f, sort_keys=True)
+    return path
+
+def as_predictors(arr):
+    """Packed cache entry -> the list-of-8-ints-per-offset form apply_predictor uses."""
+    return [unpack_rows(arr[off]) for off in range(arr.shape[0])]
+
+def exact_predictors(W, kstride, flag_len, tempered_top=False, cache=True):
+    """mt_symbolic.exact_byte_predictors, derived once per parameter set."""
+    key, params = cache_key(model="exact", kstride=kstride, W=W, flag_len=flag_len,
+                            tempered_top=tempered_top)
+    if cache:
+        hit = load(key)
+        if hit is not None:
+            print(f"[*] Loaded cached predictors {key}")
+            return as_predictors(hit), W
+    predictors, W, missing = exact_byte_predictors(W=W, kstride=kstride, flag_len=flag_len,
+                                                   tempered_top=tempered_top)
+    if missing:
+        print(f"[!] {missing} target bits are not determined by a {W}-word window; raise W")
+    elif cache:
+        save(key, params, predictors, W)
+    return predictors, W
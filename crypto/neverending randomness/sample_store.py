@@ -0,0 +1,120 @@
+# sample_store.py
+# Columnar binary store for samples.txt.
+# The text file is parsed once into
+#   leak32.npy  (n, 3)     uint32
+#   ct.npy      (n, width) uint8   ciphertexts, zero-padded to the longest
+#   ct_len.npy  (n,)       uint16
+#   pid.npy     (n,)       int64
+# in a directory next to it (samples.txt -> samples.txt.store/), and later runs
+# memory-map the columns. The store records the source's size and mtime, so an
+# edited or appended samples.txt is re-converted automatically.
+#
+#   python3 sample_store.py samples.txt      # convert (optional; load() does it too)
+
+import ast, json, os, re, sys
+import numpy as np
+
+FORMAT = 1
+COLUMNS = ("leak32", "ct", "ct_len", "pid")
+# harvester lines, optionally prefixed ("123 {...}"); anything else goes through ast
+LINE_RE = re.compile(r"\{'ciphertext_hex':\s*'([0-9a-fA-F]*)',\s*'leak32':\s*\[\s*(\d+),\s*(\d+),\s*(\d+)\s*\],"
+                     r"\s*'pid':\s*(-?\d+)\s*\}")
+
+class SampleStore:
+    def __init__(self, leak32, ct, ct_len, pid):
+        self.leak32, self.ct, self.ct_len, self.pid = leak32, ct, ct_len, pid
+
+    def __len__(self):
+        return len(self.pid)
+
+    def ciphertexts(self):
+        """Ciphertexts as a list of bytes (the shape the solvers' block lists use)."""
+        return [self.ct[i, :n].tobytes() for i, n in enumerate(self.ct_len.tolist())]
+
+    def save(self, path, meta):
+        os.makedirs(path, exist_ok=True)
+        for name in COLUMNS:
+            tmp = os.path.join(path, f"{name}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, np.ascontiguousarray(getattr(self, name)))
+            os.replace(tmp, os.path.join(path, name + ".npy"))
+        # meta last: a store without it (interrupted save) is treated as stale
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f, sort_keys=True)
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map an existing store directory."""
+        cols = [np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in COLUMNS]
+        return cls(*cols)
+
+def _parse_line(ln):
+    m = LINE_RE.search(ln)
+    if m:
+        h, a, b, c, pid = m.groups()
+        return h, (int(a), int(b), int(c)), int(pid)
+    m = re.search(r"(\{.*\})", ln)
+    if not m:
+        return None
+    d = ast.literal_eval(m.group(1))
+    return d["ciphertext_hex"], tuple(d["leak32"]), int(d.get("pid", -1))
+
+def parse_text(path):
+    """Stream samples.txt once into columns."""
+    hexes, leaks, pids = [], [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for ln in f:
+            rec = _parse_line(ln)
+            if rec is None:
+                continue
+            hexes.append(rec[0]); leaks.append(rec[1]); pids.append(rec[2])
+    n = len(hexes)
+    ct_len = np.fromiter((len(h) // 2 for h in hexes), dtype=np.uint16, count=n)
+    width = int(ct_len.max()) if n else 0
+    if n and (ct_len == width).all():
+        ct = np.frombuffer(bytes.fromhex("".join(hexes)), dtype=np.uint8).reshape(n, width)
+    else:
+        ct = np.zeros((n, width), dtype=np.uint8)
+        for i, h in enumerate(hexes):
+            ct[i, :len(h) // 2] = np.frombuffer(bytes.fromhex(h), dtype=np.uint8)
+    leak32 = np.array(leaks, dtype=np.uint32).reshape(n, 3)
+    return SampleStore(leak32, ct, ct_len, np.array(pids, dtype=np.int64))
+
+def _source_meta(path):
+    st = os.stat(path)
+    return {"format": FORMAT, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def store_path(text_path):
+    return text_path.rstrip("/") + ".store"
+
+def convert(text_path, out=None):
+    out = out or store_path(text_path)
+    meta = _source_meta(text_path)
+    store = parse_text(text_path)
+    store.save(out, dict(meta, n=len(store)))
+    return store
+
+def load(path):
+    """
+    Samples from either a store directory or a samples.txt. For text input the
+    sibling .store is used when it is up to date, otherwise (re)built.
+    """
+    if os.path.isdir(path):
+        return SampleStore.open(path)
+    sp = store_path(path)
+    try:
+        with open(os.path.join(sp, "meta.json")) as f:
+            meta = json.load(f)
+        if all(meta.get(k) == v for k, v in _source_meta(path).items()):
+            return SampleStore.open(sp)
+    except (OSError, ValueError):
+        pass
+    try:
+        return convert(path, sp)
+    except OSError:
+        return parse_text(path)           # read-only directory: parse every time
+
+if __name__ == "__main__":
+    for p in sys.argv[1:]:
+        s = convert(p)
+        print(f"{p}: {len(s)} samples -> {store_path(p)}")
@@ -0,0 +1,163 @@
+# seed_index.py
+# Precomputed seed -> first-output index for time-based seeds.
+# For every seed in a range, one tempered output of random.Random(seed) is
+# computed (vectorized init_by_array from mt_np) and stored as a sorted,
+# memory-mapped uint64 array of (output << 32 | seed) pairs, so finding the
+# seeds behind an observed output is a binary search.
+#
+# Keys:
+#   prefix  (default) the first four getrandbits(8) bytes, little-endian: for a
+#           first connection that is ct[:4] ^ b"CTF{", so the ciphertext alone is enough
+#   word    tempered output number --word of a fresh generator; only outputs a
+#           sample leaks can be looked up (69..71 = leak32 of a first connection)
+#
+# The seed range covers ts ^ pid for every ts in [start, stop) and every pid
+# below 2^pid_bits.
+#
+#   python3 seed_index.py build --out year.idx --days 365 --key prefix
+#   python3 seed_index.py lookup year.idx --samples samples.txt
+#   python3 brute_time_seed.py --index year.idx --ct ... --leak ... --pid ...
+
+import argparse, json, os, sys, time
+import numpy as np
+from multiprocessing import Pool
+from mt_np import N, M, init_by_array, first_outputs, output_at
+
+CHUNK = 1 << 15
+PREFIX = b"CTF{"
+
+def seed_range(start, stop, pid_bits):
+    """[lo, hi) containing ts ^ pid for ts in [start, stop), pid < 2^pid_bits."""
+    mask = (1 << pid_bits) - 1
+    return start & ~mask, ((stop - 1) | mask) + 1
+
+def keys_for(seeds, kind, word):
+    states = init_by_array(seeds[:, None])
+    if kind == "prefix":
+        top = (first_outputs(states, 4) >> np.uint32(24)).astype(np.uint8)
+        return np.ascontiguousarray(top).view("<u4")[:, 0]
+    return output_at(states, word)
+
+def _chunk(task):
+    lo, hi, kind, word = task
+    seeds = np.arange(lo, hi, dtype=np.uint32)
+    return lo, (keys_for(seeds, kind, word).astype(np.uint64) << np.uint64(32)) | seeds
+
+def build(out, lo, hi, kind="prefix", word=69, workers=1):
+    if not 0 <= lo < hi <= 1 << 32:
+        raise ValueError(f"seed range [{lo}, {hi}) is empty or outside 32 bits")
+    if kind not in ("prefix", "word"):
+        raise ValueError(f"unknown key {kind!r} (prefix or word)")
+    if kind == "word" and not 0 <= word < N - M:
+        raise ValueError(f"--word {word}: only outputs 0..{N - M - 1} need no full twist")
+    os.makedirs(out, exist_ok=True)
+    n = hi - lo
+    tmp = os.path.join(out, f"pairs.{os.getpid()}.tmp.npy")
+    pairs = np.lib.format.open_memmap(tmp, mode="w+", dtype="<u8", shape=(n,))
+    tasks = [(a, min(a + CHUNK, hi), kind, word) for a in range(lo, hi, CHUNK)]
+    t0 = time.perf_counter()
+    with Pool(workers) as pool:
+        for done, (a, chunk) in enumerate(pool.imap_unordered(_chunk, tasks), 1):
+            pairs[a - lo:a - lo + len(chunk)] = chunk
+            if done % 64 == 0 or done == len(tasks):
+                rate = done * CHUNK / (time.perf_counter() - t0)
+                sys.stderr.write(f"\r[*] {min(done * CHUNK, n)}/{n} seeds ({rate:.0f}/s)")
+    sys.stderr.write("\n")
+    pairs.sort()
+    pairs.flush()
+    del pairs
+    os.replace(tmp, os.path.join(out, "pairs.npy"))
+    meta = {"lo": lo, "hi": hi, "key": kind, "word": word}
+    with open(os.path.join(out, "meta.json"), "w") as f:
+        json.dump(meta, f, sort_keys=True)
+    return meta
+
+class SeedIndex:
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.pairs = np.load(os.path.join(path, "pairs.npy"), mmap_mode="r")
+
+    def lookup(self, key):
+        """All seeds whose key output equals key (binary search)."""
+        k = np.uint64(int(key) & 0xFFFFFFFF) << np.uint64(32)
+        a = np.searchsorted(self.pairs, k, side="left")
+        b = np.searchsorted(self.pairs, k | np.uint64(0xFFFFFFFF), side="right")
+        return (np.asarray(self.pairs[a:b]) & np.uint64(0xFFFFFFFF)).astype(np.int64).tolist()
+
+    def sample_key(self, ct, leak32):
+        """The key a first-connection sample exposes, or None if this index can't use it."""
+        if self.meta["key"] == "prefix":
+            return int.from_bytes(bytes(c ^ p for c, p in zip(ct, PREFIX)), "little")
+        off = self.meta["word"] - len(ct)          # leaks follow the keystream bytes
+        if 0 <= off < len(leak32):
+            return leak32[off]
+        return None
+
+    def candidates(self, ct, leak32):
+        key = self.sample_key(ct, leak32)
+        if key is None:
+            raise ValueError(f"index keyed on output {self.meta['word']}, which a sample with "
+                             f"{len(ct)} ciphertext bytes and {len(leak32)} leaks does not expose "
+                             f"(rebuild with --key prefix or --word {len(ct)})")
+        return self.lookup(key)
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("--out", required=True)
+    b.add_argument("--stop", type=int, default=None, help="last timestamp (default: now)")
+    b.add_argument("--start", type=int, default=None, help="first timestamp (default: stop - days)")
+    b.add_argument("--days", type=float, default=365)
+    b.add_argument("--pid-bits", type=int, default=22, help="pids below 2^bits (Linux pid_max is 2^22)")
+    b.add_argument("--key", choices=("word", "prefix"), default="prefix")
+    b.add_argument("--word", type=int, default=69, help="with --key word: which output (a leaked one, < 227)")
+    b.add_argument("--workers", type=int, default=os.cpu_count())
+    l = sub.add_parser("lookup")
+    l.add_argument("index")
+    l.add_argument("--value", type=int, nargs="*", default=[], help="raw key values")
+    l.add_argument("--samples", default=None, help="check every sample of a samples file/store")
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        if not 0 <= args.pid_bits <= 32:
+            ap.error("--pid-bits must be between 0 and 32")
+        stop = (args.stop or int(time.time())) + 1
+        start = args.start if args.start is not None else stop - int(args.days * 86400)
+        if start < 0 or start >= stop:
+            ap.error(f"empty or negative timestamp range [{start}, {stop})")
+        lo, hi = seed_range(start, stop, args.pid_bits)
+        print(f"[*] {hi - lo} seeds ({lo}..{hi - 1}), key {args.key}, "
+              f"{8 * (hi - lo) / 2**20:.0f} MiB")
+        t0 = time.perf_counter()
+        try:
+            build(args.out, lo, hi, args.key, args.word, args.workers)
+        except ValueError as e:
+            ap.error(str(e))
+        print(f"[*] built {args.out} in {time.perf_counter() - t0:.1f}s")
+        return
+
+    idx = SeedIndex(args.index)
+    for v in args.value:
+        print(f"{v}: seeds {idx.lookup(v)}")
+    if args.samples:
+        import sample_store
+        from brute_time_seed import replay
+        samples = sample_store.load(args.samples)
+        t0 = time.perf_counter()
+        for i, (ct, leak) in enumerate(zip(samples.ciphertexts(), samples.leak32.tolist())):
+            try:
+                seeds = idx.candidates(ct, leak)
+            except ValueError as e:
+                ap.error(str(e))
+            for seed in seeds:
+                hit = replay(ct, leak, seed)
+                if hit:
+                    print(f"[*] sample {i} pid {int(samples.pid[i])}: seed {seed} "
+                          f"(ts {seed ^ int(samples.pid[i])}) leak_confirmed {hit[1]}")
+                    print("FOUND:", hit[0])
+        print(f"[*] {len(samples)} samples looked up in {time.perf_counter() - t0:.3f}s")
+
+if __name__ == "__main__":
+    main()
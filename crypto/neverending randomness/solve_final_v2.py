@@ -1,96 +1,18 @@
 # solve_final_v2.py — robust final solver
 # Works with ~200+ lines of your samples.txt
 
-import sys, re, ast, binascii
-
-N, M = 624, 397
-MATRIX_A   = 0x9908B0DF
-UPPER_MASK = 0x80000000
-LOWER_MASK = 0x7FFFFFFF
+import os, sys, argparse
+import numpy as np
+from gf2 import M4RIFactor, pack_le
+from mt_np import MT19937, N, untemper as untemper_np
+import sample_store
+import predictor_cache
+from parallel_train import factor_and_solve
 
 K = 72          # 69 bytes (one 32-bit word each) + 3 leaked 32-bit words
 FLAG_LEN = 69   # CTF{ + 64 hex + }
-
-def untemper(y):
-    y &= 0xFFFFFFFF
-    # inverse temper
-    y ^= y >> 18
-    y ^= (y << 15) & 0xEFC60000
-    for _ in range(5): y ^= (y << 7) & 0x9D2C5680
-    y ^= y >> 11
-    y ^= y >> 22
-    return y & 0xFFFFFFFF
-
-class MT:
-    def __init__(self):
-        self.mt = [0]*N
-        self.mti = N
-    def seed_by_state(self, state_words, idx0):
-        self.mt = state_words[:]
-        self.mti = idx0 % N
-    def extract_untempered(self):
-        if self.mti >= N:
-            for i in range(N):
-                x = (self.mt[i] & UPPER_MASK) | (self.mt[(i+1)%N] & LOWER_MASK)
-                xa = x >> 1
-                if x & 1: xa ^= MATRIX_A
-                self.mt[i] = (self.mt[(i+M)%N] ^ xa) & 0xFFFFFFFF
-            self.mti = 0
-        y = self.mt[self.mti]
-        self.mti += 1
-        return y
-
-def load_samples(path):
-    samples = []
-    with open(path, "r", encoding="utf-8") as f:
-        for ln in f:
-            ln = ln.strip()
-            if not ln: continue
-            m = re.search(r"(\{.*\})", ln)
-            if not m: continue
-            d = ast.literal_eval(m.group(1))
-            samples.append(d)
-    return samples
-
-# GF(2) Gaussian elimination: rows are ints with ncols bits; solve A w = b
-def gauss_gf2(A_rows, b_bits, ncols):
-    rows = A_rows[:]
-    b = b_bits[:]
-    m = len(rows)
-    row = 0
-    pivots = []
-    for col in range(ncols):
-        mask = 1 << col
-        piv = None
-        for r in range(row, m):
-            if rows[r] & mask:
-                piv = r; break
-        if piv is None:
-            continue
-        rows[row], rows[piv] = rows[piv], rows[row]
-        b[row], b[piv] = b[piv], b[row]
-        pivots.append(col)
-        for r in range(m):
-            if r!=row and (rows[r] & mask):
-                rows[r] ^= rows[row]
-                b[r]    ^= b[row]
-        row += 1
-        if row==m: break
-    # back-sub to one solution
-    w = 0
-    for i in reversed(range(row)):
-        col = pivots[i]
-        rem = rows[i] & ~(1<<col)
-        # parity of dot(rem, w)
-        x = rem
-        s = 0
-        while x:
-            c = (x & -x).bit_length()-1
-            s ^= (w >> c) & 1
-            x &= x-1
-        val = b[i] ^ s
-        if val: w |= (1<<col)
-    return w
+REF_SEED = 0x6a09e667   # synthetic reference state for training
+EXACT_W = 700           # leak words needed for every keystream bit to be determined
 
 def poppar64(v):
     # parity of 64-bit chunk
@@ -109,58 +31,42 @@ def parity_big(v):
         v >>= 64
     return p
 
-def train_byte_predictors(kstride=K, W=256, S=9000, ref_len=1000000):
+def train_byte_predictors(kstride=K, W=256, S=9000, ref_len=1000000, cache=True, workers=None):
     """
     Learn linear predictors mapping the last W decimated words (32*W bits)
     to the low-8 of target words at offsets 0..68.
     Large W and S -> accurate predictors.
+    Results are cached on disk per (kstride, W, S, FLAG_LEN, REF_SEED).
+    workers > 1 runs the elimination and the per-offset solves on a process pool.
     """
-    # reference MT run
-    ref = MT()
-    st = [(0x6a09e667 ^ i*0x9e3779b1) & 0xFFFFFFFF for i in range(N)]
-    ref.seed_by_state(st, 0)
-
-    # generate enough untempered words
-    untemp = [ref.extract_untempered() for _ in range(ref_len)]
-    decim  = [untemp[i] for i in range(0, ref_len, kstride)]
-    D = len(decim)
-    if D <= W + S + 100:
-        need = (W + S + 200) * kstride
-        extra = need - ref_len
-        for _ in range(extra):
-            untemp.append(ref.extract_untempered())
-        decim = [untemp[i] for i in range(0, len(untemp), kstride)]
-        D = len(decim)
-
+    key, params = predictor_cache.cache_key(kstride=kstride, W=W, S=S, flag_len=FLAG_LEN, ref_seed=REF_SEED)
+    if cache:
+        hit = predictor_cache.load(key)
+        if hit is not None:
+            print(f"[*] Loaded cached predictors {key}")
+            return predictor_cache.as_predictors(hit), W
+
+    # reference untempered stream (whole-array MT19937)
+    ref = MT19937([(REF_SEED ^ i*0x9e3779b1) & 0xFFFFFFFF for i in range(N)], 0)
+    untemp = ref.untempered(max(ref_len, (W + S + 200) * kstride))
+    decim  = untemp[::kstride]
+
+    # Feature row for block b in [W .. W+S-1]: decim[b-W:b], word j at bits 32j..32j+31
     nfeat = 32*W
-    # Precompute feature rows for blocks b in [W .. W+S-1]
-    feat_rows = []
-    for b in range(W, W+S):
-        # pack 32*W features into a single big int
-        mask = 0
-        bitpos = 0
-        for j in range(b-W, b):
-            w = decim[j]
-            # append bits 0..31 (LSB-first)
-            mask |= (w & 0xFFFFFFFF) << bitpos
-            bitpos += 32
-        feat_rows.append(mask)
-
-    predictors = []
-    for off in range(FLAG_LEN):
-        # labels for S samples
-        labels = [[] for _ in range(8)]
-        for si,b in enumerate(range(W, W+S)):
-            idx = b*kstride + off
-            byte = untemp[idx] & 0xFF
-            for bit in range(8):
-                labels[bit].append((byte>>bit)&1)
-        # solve 8 GF(2) systems
-        weights = []
-        for bit in range(8):
-            w = gauss_gf2(feat_rows, labels[bit], nfeat)
-            weights.append(w)
-        predictors.append(weights)
+    feat_rows = pack_le(np.lib.stride_tricks.sliding_window_view(decim, W)[:S])
+
+    # Factor feat_rows once; all 69*8 label vectors share it.
+    # RHS row si packs the 69 target low bytes: bit 8*off+bit.
+    targets = (np.arange(W, W+S) * kstride)[:, None] + np.arange(FLAG_LEN)
+    labels = (untemp[targets] & 0xFF).astype(np.uint8)
+    if workers and workers > 1:
+        sols = factor_and_solve(feat_rows, nfeat, labels, workers)
+    else:
+        fac = M4RIFactor(feat_rows, nfeat)
+        sols = fac.solve_many(pack_le(labels), 8*FLAG_LEN)
+    predictors = [sols[8*off:8*off+8] for off in range(FLAG_LEN)]
+    if cache:
+        predictor_cache.save(key, params, predictors, W)
     return predictors, W
 
 def apply_predictor(weights, W, decim_window_words):
@@ -178,25 +84,32 @@ def apply_predictor(weights, W, decim_window_words):
     return byte
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python solve_final_v2.py samples.txt")
-        sys.exit(1)
-    samples = load_samples(sys.argv[1])
-    if not samples:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("samples")
+    ap.add_argument("--exact", action="store_true",
+                    help="derive predictors from the MT19937 linear map instead of training")
+    ap.add_argument("--tempered", action="store_true",
+                    help="with --exact: keystream byte is getrandbits(8), the tempered top byte")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="processes for training (0 = all cores)")
+    args = ap.parse_args()
+    samples = sample_store.load(args.samples)
+    if not len(samples):
         print("No samples parsed.")
         sys.exit(1)
 
     # Build decimated untempered leak stream (concat all triples in order)
-    leaks = []
-    cts = []
-    for s in samples:
-        a,b,c = s["leak32"]
-        leaks.extend([untemper(a), untemper(b), untemper(c)])
-        cts.append(bytes.fromhex(s["ciphertext_hex"]))
+    leaks = untemper_np(samples.leak32).ravel().tolist()
+    cts = samples.ciphertexts()
 
     D = len(leaks)  # 3 per sample
-    print(f"[*] Training predictors with W=256, S=9000 … (one-time)")
-    predictors, W = train_byte_predictors(W=256, S=9000, ref_len=1000000)
+    if args.exact:
+        print(f"[*] Deriving exact predictors with W={EXACT_W} from the MT19937 linear map …")
+        predictors, W = predictor_cache.exact_predictors(EXACT_W, K, FLAG_LEN, args.tempered)
+    else:
+        print(f"[*] Training predictors with W=256, S=9000 … (one-time)")
+        predictors, W = train_byte_predictors(W=256, S=9000, ref_len=1000000,
+                                              workers=args.workers or os.cpu_count())
 
     # choose a block index with enough history: need 3*j >= W  → j >= ceil(W/3)
     j = max((W + 2)//3, 90)   # with 200 samples, this is fine
@@ -5,8 +5,14 @@
 # Usage: python solve_neverending.py samples.txt
 # The samples file should contain one line per response like:
 # {'ciphertext_hex': '...', 'leak32': [a,b,c], 'pid': 7}
+# (or a samples.txt.store/ directory from sample_store.py)
 
-import sys, re, ast, binascii
+import sys, binascii
+import numpy as np
+from gf2 import pack_bits, rref_m4ri
+from mt_np import MT19937
+import lfsr
+import sample_store
 
 # -------------------- MT19937 constants & helpers --------------------
 # MT19937 parameters
@@ -29,9 +35,11 @@ def untemper(y):
     y ^= y >> 18
     # inverse of y ^= (y << 15) & 0xEFC60000
     y ^= (y << 15) & 0xEFC60000
-    # inverse of y ^= (y << 7) & 0x9D2C5680  (do in 5 rounds)
-    for _ in range(5):
-        y ^= (y << 7) & 0x9D2C5680
+    # inverse of y ^= (y << 7) & 0x9D2C5680  (4 rounds against the original y)
+    t = y
+    for _ in range(4):
+        t = y ^ ((t << 7) & 0x9D2C5680)
+    y = t
     # inverse of y ^= y >> 11  (do in 2 rounds)
     y ^= y >> 11
     y ^= y >> 22
@@ -102,28 +110,13 @@ def bits_to_word(bits):
 #
 # This keeps code short and robust.
 
+# The list-of-bits API below is kept for main(); the work happens on packed
+# ints in lfsr.py (bitset Berlekamp-Massey, O(log N) polynomial jump-ahead).
+
 def berlekamp_massey(bits):
     # bits: list of 0/1 over GF(2)
-    C = [0]*len(bits); B = [0]*len(bits)
-    C[0] = B[0] = 1
-    L = m = 0
-    b = 1
-    for n in range(len(bits)):
-        # compute discrepancy
-        d = bits[n]
-        for i in range(1, L+1):
-            d ^= C[i] & bits[n-i]
-        if d == 1:
-            T = C[:]
-            for i in range(n-m, len(C)):
-                C[i] ^= B[i-(n-m)]
-            if 2*L <= n:
-                L = n+1 - L
-                B = T
-                m = n
-                b = 1
-    # Trim to length L+1
-    return C[:L+1], L
+    C, L = lfsr.berlekamp_massey(lfsr.bits_to_int(bits), len(bits))
+    return lfsr.int_to_bits(C, L+1), L
 
 def fit_lfsr_coeffs(sequence_bits):
     C, L = berlekamp_massey(sequence_bits)
@@ -132,35 +125,23 @@ def fit_lfsr_coeffs(sequence_bits):
 
 def extend_lfsr(coeffs, state_bits, steps):
     L = len(coeffs)-1
-    s = state_bits[:]
-    for _ in range(steps):
-        nxt = 0
-        for i in range(1, L+1):
-            nxt ^= coeffs[i] & s[-i]
-        s.append(nxt)
-    return s
-
-# -------------------- Parse samples --------------------
-def load_samples(path):
-    samples = []
-    with open(path, "r", encoding="utf-8") as f:
-        for ln in f:
-            ln = ln.strip()
-            if not ln: continue
-            # accept lines like: 123 {...}
-            m = re.search(r"(\{.*\})", ln)
-            if not m: continue
-            d = ast.literal_eval(m.group(1))
-            samples.append(d)
-    return samples
+    n = len(state_bits)
+    s = lfsr.extend(lfsr.bits_to_int(coeffs), L, lfsr.bits_to_int(state_bits), n, steps)
+    return lfsr.int_to_bits(s, n + steps)
+
+def jump_lfsr(coeffs, state_bits, steps):
+    # bit number len(state_bits)-1+steps of the sequence, without stepping through the gap
+    L = len(coeffs)-1
+    window = lfsr.bits_to_int(state_bits[len(state_bits)-L:])
+    return lfsr.jump(lfsr.bits_to_int(coeffs), L, window, L-1+steps)
 
 # -------------------- Main solver --------------------
 def main():
     if len(sys.argv) != 2:
         print("Usage: python solve_neverending.py samples.txt")
         sys.exit(1)
-    samples = load_samples(sys.argv[1])
-    if not samples:
+    samples = sample_store.load(sys.argv[1])
+    if not len(samples):
         print("No samples parsed.")
         sys.exit(1)
 
@@ -168,12 +149,8 @@ def main():
     # Each sample contributes three consecutive outputs at global indices: t+72*i, t+72*i+1, t+72*i+2
     # We don't know t, but decimation is uniform; for BM we only need a long scalar bit sequence in order.
     # We'll stitch triples back-to-back in their arrival order; this gives us a decimated stream with gaps of 69 words between triples — which is fine because we're modeling the decimated generator directly.
-    tempered_leaks = []
-    blocks = []
-    for s in samples:
-        a,b,c = s["leak32"]
-        tempered_leaks.extend([a&0xFFFFFFFF, b&0xFFFFFFFF, c&0xFFFFFFFF])
-        blocks.append(bytes.fromhex(s["ciphertext_hex"]))
+    tempered_leaks = samples.leak32.ravel().tolist()
+    blocks = samples.ciphertexts()
 
     # Untemper to get decimated untempered outputs
     decim_untempered = [untemper(x) for x in tempered_leaks]
@@ -221,14 +198,12 @@ def main():
     window = 800  # safety margin
 
     # Build training data from a reference MT to learn linear relations.
-    ref = MT()
     # seed arbitrarily
     st = [i*0x9E3779B1 & 0xFFFFFFFF for i in range(N)]
-    ref.seed_by_state(st, 0)
 
     # produce a long run of untempered outputs
     REF_LEN = 10000
-    ref_untemp = [ref.extract_untempered() for _ in range(REF_LEN)]
+    ref_untemp = MT19937(st, 0).untempered(REF_LEN).tolist()
     # decimated view
     ref_decim = [ref_untemp[i] for i in range(0, REF_LEN, k)]
     # construct bitstreams
@@ -276,45 +251,18 @@ def main():
             for bit in range(8):
                 Y[bit].append((byte>>bit)&1)
         # Solve 8 independent linear systems X * w_bit = Y_bit over GF(2) via Gauss
-        import array
         m = len(X); n = len(X[0])
-        # pack rows into bitarrays for speed
+        # pack rows into uint64 words once; every bit shares the packed X
+        Xp = pack_bits(X)
+        chunks = Xp.shape[1]
         def solve_bit(rhs):
-            rows = [array.array('Q', []) for _ in range(m)]
-            # pack into 64-bit chunks
-            chunks = (n + 63)//64
-            A = [ [0]*chunks for _ in range(m) ]
-            for r in range(m):
-                for c in range(n):
-                    if X[r][c]:
-                        A[r][c>>6] |= (1<<(c&63))
-            bvec = [rhs[r] for r in range(m)]
-            # Gaussian elimination
-            row = 0
-            pivots = []
-            for col in range(n):
-                # find pivot
-                piv = None
-                for r in range(row, m):
-                    if (A[r][col>>6] >> (col&63)) & 1:
-                        piv = r; break
-                if piv is None: 
-                    continue
-                # swap
-                A[row], A[piv] = A[piv], A[row]
-                bvec[row], bvec[piv] = bvec[piv], bvec[row]
-                pivots.append(col)
-                # eliminate
-                for r in range(m):
-                    if r!=row and ((A[r][col>>6]>>(col&63))&1):
-                        for cc in range(chunks):
-                            A[r][cc] ^= A[row][cc]
-                        bvec[r] ^= bvec[row]
-                row += 1
-                if row==m: break
+            # M4RI elimination of [X | rhs]; the RHS rides in one extra word
+            A = np.hstack([Xp, np.asarray(rhs, dtype="<u8")[:, None]])
+            pivots = rref_m4ri(A, n)
+            bvec = [int(x) for x in A[:, chunks]]
             # build weight vector (sparse back-sub not needed; we only need to *apply* predictor later)
             # Instead, we return the reduced-row-echelon form rows to reuse as predictor.
-            return (A, bvec, pivots, n, chunks)
+            return (A[:, :chunks], bvec, pivots, n, chunks)
 
         solved = [solve_bit(Y[bit]) for bit in range(8)]
 
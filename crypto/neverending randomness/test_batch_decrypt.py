@@ -0,0 +1,40 @@
+# test_batch_decrypt.py
+# python3 -m pytest -q test_batch_decrypt.py
+
+import random
+import numpy as np
+from batch_decrypt import window_rows, batch_decrypt
+from solve_final import apply_predictor
+
+W = 32
+FLAG_LEN = 69
+
+def _predictors(rng):
+    return [[rng.getrandbits(32*W) for _ in range(8)] for _ in range(FLAG_LEN)]
+
+def test_window_rows_too_few_leaks():
+    blocks, rows = window_rows(list(range(20)), W)
+    assert blocks.shape == (0,)
+    assert rows.shape == (0, W // 2) and rows.dtype == np.dtype("<u8")
+
+def test_batch_decrypt_no_blocks():
+    rng = random.Random(1)
+    preds = _predictors(rng)
+    leaks = [rng.getrandbits(32) for _ in range(20)]
+    cts = [bytes(FLAG_LEN)] * 7
+    for c in (cts, np.zeros((7, FLAG_LEN), dtype=np.uint8)):
+        blocks, pts = batch_decrypt(preds, W, leaks, c)
+        assert len(blocks) == 0 and pts.shape == (0, FLAG_LEN)
+
+def test_batch_decrypt_matches_single_block():
+    rng = random.Random(2)
+    preds = _predictors(rng)
+    n = 20
+    leaks = [rng.getrandbits(32) for _ in range(3*n)]
+    cts = [bytes(rng.getrandbits(8) for _ in range(FLAG_LEN)) for _ in range(n)]
+    blocks, pts = batch_decrypt(preds, W, leaks, cts)
+    assert blocks.tolist() == list(range(-(-W // 3), n))
+    for j, pt in zip(blocks.tolist(), pts):
+        window = leaks[3*j - W:3*j]
+        ks = bytes(apply_predictor(preds[off], W, window) for off in range(FLAG_LEN))
+        assert pt.tobytes() == bytes(a ^ b for a, b in zip(cts[j], ks))